@@ -0,0 +1,90 @@
+import re
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.dependencies import get_speech_service
+from app.services.speech import AUDIO_URL_PREFIX, SpeechService
+from app.services.tts_backends import audio_mime_type
+from app.services.tts_cache import SUFFIXES
+
+router = APIRouter(prefix=AUDIO_URL_PREFIX, tags=["audio"])
+
+CHUNK_SIZE = 64 * 1024
+_SINGLE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# The disk tier names each clip after its sniffed format, so no file read is needed here.
+_SUFFIX_TYPES = {suffix: mime_type for mime_type, suffix in SUFFIXES.items()}
+
+
+@router.api_route(
+    "/{audio_id}",
+    methods=["GET", "HEAD"],
+    summary="Raw audio (MP3, or WAV from the local engine) for an audio id returned by /respond (supports Range requests)",
+    response_class=Response,
+)
+async def audio_clip(
+    request: Request,
+    audio_id: str = Path(..., pattern=r"^[0-9a-f]{64}$"),
+    speech: SpeechService = Depends(get_speech_service),
+) -> Response:
+    # Clips are addressed by (text, voice, rate, volume), so an id always maps to the same audio.
+    headers = {"Cache-Control": "private, max-age=3600", "ETag": f'"{audio_id}"'}
+    audio = speech.clip(audio_id)
+    if audio is not None:
+        return _bytes_response(audio, request.headers.get("range"), headers)
+    path = speech.clip_file(audio_id)
+    if path is not None and path.exists():
+        # Starlette answers Range requests for files itself.
+        media_type = _SUFFIX_TYPES.get(path.suffix, "audio/mpeg")
+        return FileResponse(path, media_type=media_type, headers=headers)
+    raise HTTPException(status_code=404, detail="Audio expired or unknown; request a new response")
+
+
+def _bytes_response(audio: bytes, range_header: Optional[str], headers: Dict[str, str]) -> Response:
+    size = len(audio)
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    start, end, status_code = 0, size, 200
+    if range_header:
+        requested = _parse_range(range_header, size)
+        if requested == (size, size):
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        if requested is not None:
+            start, end = requested
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+
+    # Slices of a memoryview share the cached buffer, so no copy is made before the socket.
+    view = memoryview(audio)[start:end]
+
+    async def body() -> AsyncIterator[memoryview]:
+        for offset in range(0, len(view), CHUNK_SIZE):
+            yield view[offset : offset + CHUNK_SIZE]
+
+    return StreamingResponse(
+        body(), status_code=status_code, media_type=audio_mime_type(audio), headers=headers
+    )
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Half-open byte range for a single `bytes=` range; (size, size) if unsatisfiable.
+
+    Multi-range and malformed headers return None and get the whole clip, which RFC 9110
+    allows a server to do.
+    """
+    match = _SINGLE_RANGE.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            return size, size
+        return max(0, size - suffix), size
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return size, size
+    return start, min(int(last) + 1, size) if last else size
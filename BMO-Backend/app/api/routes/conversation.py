@@ -1,27 +1,170 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import base64
+from typing import AsyncIterator, Awaitable, Literal, Optional, TypeVar
 
-from app.dependencies import get_conversation_service
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.requests import HTTPConnection
+
+from app.core.config import get_settings
+from app.dependencies import get_admission_scheduler, get_conversation_service, get_ws_connections
 from app.schemas.conversation import RespondPayload, RespondRequest, WakeResponse
+from app.services.admission import AdmissionScheduler, admit_client
+from app.services.audio_formats import negotiate_audio_format
+from app.services.concurrency import Bulkhead, Overloaded
 from app.services.conversation import ConversationService
+from app.services.conversation_socket import ConversationSocket, SlowConsumer
+from app.services.metrics import server_timing
+from app.services.streaming import format_sse
+from app.services.turns import TurnRegistry
 
 router = APIRouter(prefix="/api/v1/conversation", tags=["conversation"])
 
+T = TypeVar("T")
+# nginx's "client closed request"; nobody reads it, but it keeps access logs honest.
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+def _audio_format(requested: Optional[str], connection: HTTPConnection) -> Optional[str]:
+    return negotiate_audio_format(requested, connection.headers.get("accept"), get_settings().tts_audio_format)
+
+
+async def _cancel_on_disconnect(request: Request, turns: TurnRegistry, work: Awaitable[T]) -> T:
+    """Await `work`, cancelling it (and its upstream calls) if the client goes away first."""
+    task = asyncio.ensure_future(work)
 
-@router.post("/wake", response_model=WakeResponse, summary="Initiate a session")
+    async def watch() -> None:
+        # The body has been read, so the next ASGI message is the disconnect.
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+        turns.cancel(task, "disconnected")
+
+    watcher = asyncio.create_task(watch())
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if watcher.done() and not watcher.cancelled():
+            raise ClientDisconnected() from None
+        raise
+    finally:
+        watcher.cancel()
+
+
+@router.post(
+    "/wake",
+    response_model=WakeResponse,
+    response_model_exclude_none=True,
+    summary="Initiate a session and return the spoken greeting",
+)
 async def wake(
+    request: Request,
+    audio_delivery: Optional[Literal["inline", "url", "both"]] = Query(
+        None, description="How the greeting audio is returned (see RespondRequest.audio_delivery)"
+    ),
+    audio_format: Optional[Literal["mp3", "mp3-low", "opus"]] = Query(
+        None, description="Greeting audio format (see RespondRequest.audio_format)"
+    ),
     service: ConversationService = Depends(get_conversation_service),
 ) -> WakeResponse:
-    return await service.start_session()
-
+    return await service.start_session(audio_delivery, _audio_format(audio_format, request))
 
 
 @router.post(
     "/respond",
     response_model=RespondPayload,
+    response_model_exclude_none=True,
     summary="Generate navigation guidance + speech from a transcript",
 )
 async def respond(
     payload: RespondRequest,
+    request: Request,
+    response: Response,
     service: ConversationService = Depends(get_conversation_service),
+    scheduler: Optional[AdmissionScheduler] = Depends(get_admission_scheduler),
 ) -> RespondPayload:
-    return await service.generate_response(payload.session_id, payload.transcript)
+    audio_format = _audio_format(payload.audio_format, request)
+
+    async def answer() -> dict:
+        async with admit_client(scheduler, request.headers) as degrade:
+            if degrade:
+                response.headers["X-BMO-Degraded"] = ",".join(degrade)
+            return await service.generate_response(
+                payload.session_id, payload.transcript, payload.audio_delivery, degrade, audio_format
+            )
+
+    try:
+        result = await _cancel_on_disconnect(request, service.turns, answer())
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    timings = result.pop("timings", None)
+    if get_settings().server_timing_enabled:
+        response.headers["Server-Timing"] = server_timing(timings)
+    return result
+
+
+@router.post(
+    "/respond/stream",
+    summary="Stream navigation guidance and speech chunks as Server-Sent Events",
+    response_class=StreamingResponse,
+)
+async def respond_stream(
+    payload: RespondRequest,
+    request: Request,
+    service: ConversationService = Depends(get_conversation_service),
+    scheduler: Optional[AdmissionScheduler] = Depends(get_admission_scheduler),
+) -> StreamingResponse:
+    audio_format = _audio_format(payload.audio_format, request)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async with admit_client(scheduler, request.headers) as degrade:
+                async for event, data in service.stream_response(
+                    payload.session_id, payload.transcript, degrade, audio_format
+                ):
+                    if event == "audio":
+                        data = {"mime_type": data["mime_type"], "base64": base64.b64encode(data["audio"]).decode("utf-8")}
+                    yield format_sse(event, data)
+        except HTTPException as exc:
+            # Admission was refused after the 200 went out; report it in-band.
+            yield format_sse("error", {"status_code": exc.status_code, "detail": exc.detail})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def conversation_socket(
+    websocket: WebSocket,
+    session_id: Optional[str] = Query(None, description="Resume this session instead of greeting a new one"),
+    audio_format: Optional[Literal["mp3", "mp3-low", "opus"]] = Query(
+        None, description="Audio format for every clip on this connection (see RespondRequest.audio_format)"
+    ),
+    connections: Bulkhead = Depends(get_ws_connections),
+    service: ConversationService = Depends(get_conversation_service),
+    scheduler: Optional[AdmissionScheduler] = Depends(get_admission_scheduler),
+) -> None:
+    settings = get_settings()
+    await websocket.accept()
+    try:
+        async with connections.slot():
+            channel = ConversationSocket(
+                websocket,
+                service,
+                scheduler=scheduler,
+                send_timeout_seconds=settings.ws_send_timeout_seconds,
+                audio_format=_audio_format(audio_format, websocket),
+            )
+            await channel.run(session_id)
+    except WebSocketDisconnect:
+        pass
+    except Overloaded:
+        await websocket.close(code=1013, reason="BMO is at its connection limit. Retry shortly.")
+    except SlowConsumer:
+        await websocket.close(code=1008, reason="Client stopped reading.")
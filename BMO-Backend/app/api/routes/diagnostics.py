@@ -0,0 +1,147 @@
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends
+
+from app.dependencies import (
+    get_admission_scheduler,
+    get_answer_bundle,
+    get_chat_flights,
+    get_conversation_service,
+    get_llm_limits,
+    get_map_loader,
+    get_openrouter_client,
+    get_response_cache,
+    get_session_store,
+    get_speech_service,
+    get_stage_latency,
+    get_turn_registry,
+)
+from app.services.admission import AdmissionScheduler
+from app.services.answer_bundle import AnswerBundle
+from app.services.concurrency import ConcurrencyLimits, SingleFlight
+from app.services.conversation import ConversationService
+from app.services.map_loader import MapLoader
+from app.services.model_stats import LatencyTracker
+from app.services.openrouter import OpenRouterClient
+from app.services.response_cache import ResponseCache
+from app.services.session_store import SessionBackend
+from app.services.speech import SpeechService
+from app.services.turns import TurnRegistry
+
+router = APIRouter(prefix="/api/v1/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/tts-cache", summary="TTS audio cache hit/miss/byte counters")
+async def tts_cache_stats(
+    speech: SpeechService = Depends(get_speech_service),
+) -> Dict[str, object]:
+    if speech.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **speech.cache.stats()}
+
+
+@router.get("/tts-backends", summary="TTS backend order, health and latency per character")
+async def tts_backends(
+    speech: SpeechService = Depends(get_speech_service),
+) -> Dict[str, object]:
+    return {
+        "configured": [backend.name for backend in speech.backends],
+        "order": [backend.name for backend in speech.ordered_backends()],
+        "selection": speech.settings.tts_backend_selection,
+        "breakers": speech.backend_health.snapshot(),
+        "seconds_per_char": speech.backend_latency.snapshot(),
+    }
+
+
+@router.get("/response-cache", summary="Normalized response cache counters")
+async def response_cache_stats(
+    cache: Optional[ResponseCache] = Depends(get_response_cache),
+) -> Dict[str, object]:
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/models", summary="Circuit breaker state and latency per OpenRouter model")
+async def model_health(
+    service: ConversationService = Depends(get_conversation_service),
+) -> Dict[str, object]:
+    return {
+        "configured": service.configured_models,
+        "order": service.model_candidates,
+        "breakers": service.model_health.snapshot(),
+        "latency": service.latency_tracker.snapshot(),
+    }
+
+
+@router.get("/sessions", summary="Session store size and eviction counters")
+async def session_stats(
+    store: SessionBackend = Depends(get_session_store),
+) -> Dict[str, object]:
+    return await store.stats()
+
+
+@router.get("/openrouter-pool", summary="OpenRouter HTTP connection pool usage and wait times")
+async def openrouter_pool(
+    client: OpenRouterClient = Depends(get_openrouter_client),
+) -> Dict[str, object]:
+    return client.pool_snapshot()
+
+
+@router.get("/prompt", summary="Static prompt prefix hash and token counts before/after compaction")
+async def prompt_prefix_stats(
+    loader: MapLoader = Depends(get_map_loader),
+) -> Dict[str, object]:
+    return loader.current.prompt_prefix.snapshot()
+
+
+@router.get("/map", summary="Loaded campus map version, hash and reload counters")
+async def map_stats(
+    loader: MapLoader = Depends(get_map_loader),
+) -> Dict[str, object]:
+    return loader.snapshot()
+
+
+@router.get("/concurrency", summary="LLM bulkhead occupancy and request coalescing counters")
+async def concurrency_stats(
+    limits: ConcurrencyLimits = Depends(get_llm_limits),
+    chat_flights: Optional[SingleFlight] = Depends(get_chat_flights),
+    speech: SpeechService = Depends(get_speech_service),
+) -> Dict[str, object]:
+    return {
+        **limits.snapshot(),
+        "chat_flights": chat_flights.snapshot() if chat_flights else None,
+        "tts_flights": speech.flights.snapshot() if speech.flights else None,
+    }
+
+
+@router.get("/pipeline", summary="Per-stage /respond timings (seconds) and time saved by overlapping them")
+async def pipeline_stats(
+    tracker: LatencyTracker = Depends(get_stage_latency),
+) -> Dict[str, object]:
+    return tracker.snapshot()
+
+
+@router.get("/turns", summary="In-flight turns and turns cancelled before answering")
+async def turns(
+    registry: TurnRegistry = Depends(get_turn_registry),
+) -> Dict[str, object]:
+    return registry.snapshot()
+
+
+@router.get("/admission", summary="Admission slots, queues and decisions per client class")
+async def admission(
+    scheduler: Optional[AdmissionScheduler] = Depends(get_admission_scheduler),
+) -> Dict[str, object]:
+    if scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, **scheduler.snapshot()}
+
+
+@router.get("/bundle", summary="The precomputed answer bundle and how often it was served from")
+async def answer_bundle(
+    bundle: Optional[AnswerBundle] = Depends(get_answer_bundle),
+) -> Dict[str, object]:
+    if bundle is None:
+        return {"loaded": False}
+    return {"loaded": True, **bundle.snapshot()}
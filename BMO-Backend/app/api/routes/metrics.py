@@ -0,0 +1,46 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.dependencies import (
+    get_admission_scheduler,
+    get_llm_limits,
+    get_metrics,
+    get_openrouter_client,
+    get_session_store,
+    get_ws_connections,
+)
+from app.services.admission import AdmissionScheduler
+from app.services.concurrency import Bulkhead, ConcurrencyLimits
+from app.services.metrics import CONTENT_TYPE, Metrics
+from app.services.openrouter import OpenRouterClient
+from app.services.session_store import SessionBackend
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+async def metrics(
+    registry: Metrics = Depends(get_metrics),
+    store: SessionBackend = Depends(get_session_store),
+    limits: ConcurrencyLimits = Depends(get_llm_limits),
+    client: OpenRouterClient = Depends(get_openrouter_client),
+    sockets: Bulkhead = Depends(get_ws_connections),
+    scheduler: Optional[AdmissionScheduler] = Depends(get_admission_scheduler),
+) -> PlainTextResponse:
+    # Gauges are read at scrape time so the request path never pays for them.
+    stats = await store.stats()
+    registry.active_sessions.set(stats.get("sessions", 0))
+    if "messages" in stats:
+        registry.session_messages.set(stats["messages"])
+    if "pending" in stats:
+        registry.session_pending.set(stats["pending"])
+    registry.llm_in_flight.set(limits.total.active)
+    registry.llm_queued.set(limits.total.waiting)
+    registry.openrouter_in_flight.set(client.metrics.in_flight)
+    registry.ws_connections.set(sockets.active)
+    if scheduler is not None:
+        for client_class, state in scheduler.snapshot()["classes"].items():
+            registry.admission_waiting.set(state["waiting"], client_class)
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
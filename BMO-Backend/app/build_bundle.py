@@ -0,0 +1,142 @@
+"""Build the offline answer bundle: canonical navigation answers plus their audio.
+
+Every building and zone on the campus map is asked about with a few phrasings
+("where is", "how do i get to", ...). Answers come from the local map navigator,
+or with `--llm` from OpenRouter for the questions the navigator cannot answer
+(and for any extra questions in `--queries`, one per line). Each narration and the
+wake greeting are synthesized with the configured TTS backends. Everything is
+written to one file that the server memory-maps when `ANSWER_BUNDLE_PATH` points
+at it, so these questions are answered with audio even while the uplink is down.
+
+    python -m app.build_bundle --output bmo-answers.bundle
+    python -m app.build_bundle --output bmo-answers.bundle --llm --queries extra-questions.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.services.answer_bundle import write_bundle
+from app.services.campus_map import CampusMap
+from app.services.conversation import SYSTEM_PROMPT, ConversationService
+from app.services.map_loader import MapLoader
+from app.services.openrouter import OpenRouterClient
+from app.services.response_cache import normalize_transcript
+from app.services.session_store import SessionStore
+from app.services.speech import SpeechService
+from app.services.tts_backends import build_backends
+
+PREFIXES = ("where is", "how do i get to", "take me to", "directions to")
+# Per-turn fields added by the conversation service; the server fills them in again.
+TURN_FIELDS = ("session_id", "transcript", "speech", "timings")
+
+logger = logging.getLogger("app.build_bundle")
+
+
+def canonical_queries(campus_map: CampusMap) -> List[str]:
+    targets = [f"building {number}" for number in sorted(campus_map.buildings)]
+    targets += [f"{color} zone" for color in sorted(campus_map.zones)]
+    return [f"{prefix} {target}" for prefix in PREFIXES for target in targets]
+
+
+async def build(args: argparse.Namespace) -> Dict[str, Any]:
+    settings = get_settings()
+    loader = MapLoader(system_prompt=SYSTEM_PROMPT, map_mode=settings.prompt_map_mode)
+    snapshot = loader.current
+    speech = SpeechService(settings, backends=build_backends(settings))
+    await speech.start()
+    openrouter: Optional[OpenRouterClient] = None
+    service: Optional[ConversationService] = None
+    if args.llm:
+        openrouter = OpenRouterClient(settings)
+        service = ConversationService(
+            # The navigator already ran; everything that reaches the service goes to the LLM.
+            settings=settings.model_copy(update={"local_navigation_enabled": False}),
+            session_store=SessionStore(),
+            openrouter=openrouter,
+            speech_service=speech,
+            map_loader=loader,
+        )
+
+    questions = canonical_queries(snapshot.campus_map)
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as handle:
+            questions += [line.strip() for line in handle if line.strip()]
+
+    answers: Dict[str, Dict[str, Any]] = {}
+    skipped: List[str] = []
+    try:
+        for question in questions:
+            key = normalize_transcript(question, snapshot.campus_map)
+            if not key or key in answers:
+                continue
+            payload = snapshot.navigator.answer(question)
+            if payload is None and service is not None:
+                try:
+                    # Audio is synthesized once per distinct narration below.
+                    result = await service.generate_response(str(uuid.uuid4()), question, degrade=("no_audio",))
+                except Exception as exc:
+                    logger.warning("LLM failed for %r: %s", question, getattr(exc, "detail", exc))
+                    result = None
+                if result is not None:
+                    payload = {name: value for name, value in result.items() if name not in TURN_FIELDS}
+            if payload is None:
+                skipped.append(question)
+                continue
+            answers[key] = payload
+
+        narrations = {payload["narration"] for payload in answers.values()}
+        narrations.add(settings.default_greeting)
+        clips = {}
+        for narration in sorted(narrations):
+            audio_id, clip = await speech.keyed_audio(narration)
+            clips[audio_id] = clip
+    finally:
+        await speech.aclose()
+        if openrouter is not None:
+            await openrouter.aclose()
+
+    size = write_bundle(
+        args.output,
+        answers=answers,
+        clips=clips,
+        map_hash=snapshot.content_hash,
+        voice=settings.edge_tts_voice,
+    )
+    return {
+        "output": args.output,
+        "bytes": size,
+        "answers": len(answers),
+        "clips": len(clips),
+        "map_hash": snapshot.content_hash,
+        "skipped": skipped,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bmo-answers.bundle", help="bundle file to write")
+    parser.add_argument("--llm", action="store_true", help="ask OpenRouter what the local navigator cannot answer")
+    parser.add_argument("--queries", help="file with extra questions, one per line (answered with --llm)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    report = asyncio.run(build(args))
+    logger.info(
+        "Wrote %s: %d answers, %d clips, %d bytes",
+        report["output"],
+        report["answers"],
+        report["clips"],
+        report["bytes"],
+    )
+    for question in report["skipped"]:
+        logger.info("No answer for %r%s", question, "" if args.llm else " (try --llm)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # optional dependency: pip install brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+# Compressing more than this on the event loop would stall other requests.
+THREAD_THRESHOLD_BYTES = 64 * 1024
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "application/javascript")
+
+
+def _compressors(gzip_level: int, brotli_quality: int) -> Dict[str, Callable[[bytes], bytes]]:
+    compressors: Dict[str, Callable[[bytes], bytes]] = {
+        "gzip": lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    }
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    return compressors
+
+
+def choose_encoding(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """The first of `available` (in preference order) the client accepts with q > 0."""
+    accepted: Dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *params = (part.strip() for part in coding.split(";"))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """Brotli (when installed) or gzip for complete JSON and text responses.
+
+    Unlike Starlette's GZipMiddleware, streamed bodies (SSE, audio) and anything that
+    is not a compressible type pass through untouched: audio is already compressed,
+    and buffering a compressor would hold back Server-Sent Events.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        brotli_quality: int = 5,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors = _compressors(gzip_level, brotli_quality)
+        self.preference = tuple(name for name in ("br", "gzip") if name in self.compressors)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.preference)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            compress = self.compressors[encoding]
+            if len(body) > THREAD_THRESHOLD_BYTES:
+                body = await asyncio.to_thread(compress, body)
+            else:
+                body = compress(body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
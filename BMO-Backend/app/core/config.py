@@ -1,8 +1,8 @@
 import json
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import field_validator, model_validator
+from pydantic import BaseModel, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -22,12 +22,28 @@ def forgiving_json_loads(value):
     return value
 
 
+class AdmissionClass(BaseModel):
+    """One client class of the /respond admission scheduler."""
+
+    # Share of free slots under contention, relative to the other classes.
+    weight: float = 1.0
+    # Token bucket; 0 disables rate limiting for the class.
+    rate_per_second: float = 0.0
+    burst: int = 10
+    # Requests of this class that may wait for a slot; more are answered 503.
+    max_queue: int = 16
+    # Applied under load: "cheap_model" routes to ADMISSION_DEGRADED_MODEL, "no_audio" skips TTS.
+    degrade: List[Literal["cheap_model", "no_audio"]] = []
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore",
         json_loads=forgiving_json_loads,
+        # Allow the model_breaker_* fields without pydantic's "model_" namespace warning.
+        protected_namespaces=("settings_",),
     )
 
     app_name: str = "BMO Backend"
@@ -38,6 +54,8 @@ class Settings(BaseSettings):
     cors_origins: List[str] = ["http://localhost:3000", "https://localhost:3000"]
 
     openrouter_api_key: str
+    # Point at a compatible endpoint (e.g. the load-test fake) instead of openrouter.ai.
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
     openrouter_model: str = "google/gemini-2.0-flash-lite-001"
     openrouter_models: List[str] = [
         "google/gemini-2.0-flash-lite-001",
@@ -46,11 +64,135 @@ class Settings(BaseSettings):
         "meta-llama/llama-4-scout:free",
     ]
     openrouter_temperature: float = 0.2
+    # "off" tries models one after another, "hedge" starts the next model once the current one
+    # exceeds its latency budget, "race" starts every candidate at once.
+    openrouter_hedging: Literal["off", "hedge", "race"] = "off"
+    openrouter_hedge_delay_seconds: float = 2.0
+    openrouter_hedge_min_delay_seconds: float = 0.5
+    openrouter_hedge_max_delay_seconds: float = 8.0
+    openrouter_hedge_percentile: float = 95.0
+    openrouter_hedge_min_samples: int = 5
+    openrouter_max_connections: int = 20
+    openrouter_max_keepalive_connections: int = 10
+    openrouter_keepalive_expiry_seconds: float = 60.0
+    # Only takes effect when the `h2` package is installed; otherwise HTTP/1.1 is used.
+    openrouter_http2: bool = True
+    openrouter_connect_timeout_seconds: float = 5.0
+    openrouter_read_timeout_seconds: float = 60.0
+    openrouter_pool_timeout_seconds: float = 10.0
+    openrouter_prewarm: bool = True
+    # Bulkheads: LLM requests beyond the limits wait in a bounded queue; a full queue (or a
+    # wait longer than llm_queue_timeout_seconds) answers 503 with Retry-After immediately.
+    llm_max_concurrency: int = 16
+    llm_max_queue: int = 32
+    llm_max_concurrency_per_model: int = 8
+    llm_max_queue_per_model: int = 16
+    llm_queue_timeout_seconds: float = 10.0
+    overload_retry_after_seconds: int = 2
+    # Admission scheduler in front of /respond and WebSocket turns: weighted fair queuing over
+    # client classes, identified by API key (ADMISSION_API_KEYS maps key -> class) or, when
+    # ADMISSION_TRUST_HEADER is set, by the class header. Degradable classes lose their
+    # expensive parts once admission_degrade_utilization of the slots are busy.
+    admission_enabled: bool = False
+    admission_max_concurrency: int = 16
+    admission_queue_timeout_seconds: float = 10.0
+    admission_degrade_utilization: float = 0.75
+    admission_default_class: str = "web"
+    admission_class_header: str = "X-BMO-Client-Class"
+    admission_api_key_header: str = "X-BMO-API-Key"
+    # The class header is spoofable by any browser; only trust it on a closed kiosk network.
+    admission_trust_header: bool = False
+    admission_api_keys: Dict[str, str] = {}
+    admission_classes: Dict[str, AdmissionClass] = {
+        "kiosk": AdmissionClass(weight=8.0, max_queue=32),
+        "web": AdmissionClass(
+            weight=1.0, rate_per_second=2.0, burst=10, max_queue=8, degrade=["cheap_model", "no_audio"]
+        ),
+    }
+    # Model used for "cheap_model"; defaults to the first ":free" entry of openrouter_models.
+    admission_degraded_model: Optional[str] = None
+    # Identical in-flight LLM prompts and TTS texts share one upstream call.
+    single_flight_enabled: bool = True
+    # Models (id prefixes) that get an explicit prompt-cache breakpoint on the static prefix.
+    openrouter_prompt_cache_models: List[str] = ["anthropic/", "google/gemini"]
+
+    # "full" sends the whole compacted map every turn; "slice" only the lines about the
+    # buildings and zones mentioned in the last `prompt_slice_context_turns` questions.
+    prompt_map_mode: Literal["full", "slice"] = "full"
+    prompt_slice_context_turns: int = 2
+
+    # aiu_map.md is watched and hot-swapped; polling is only used without inotify support.
+    map_reload_enabled: bool = True
+    map_poll_interval_seconds: float = 2.0
+
+    model_breaker_window: int = 50
+    model_breaker_min_calls: int = 10
+    model_breaker_failure_rate: float = 0.5
+    model_breaker_open_seconds: float = 30.0
+    model_breaker_slow_call_seconds: float = 10.0
 
     edge_tts_voice: str = "en-US-JennyNeural"
     edge_tts_rate: str = "+0%"
     edge_tts_volume: str = "+0%"
 
+    # Default for RespondRequest.audio_delivery: "inline" (base64), "url" or "both".
+    audio_delivery: Literal["inline", "url", "both"] = "inline"
+    # Return the prewarmed greeting audio from /wake.
+    wake_greeting_audio: bool = True
+    # Add a Server-Timing header with per-stage durations to /respond.
+    server_timing_enabled: bool = False
+    # gzip (or brotli, if installed) for JSON responses of at least this many bytes.
+    response_compression_enabled: bool = True
+    response_compression_min_bytes: int = 1024
+    # Synthesize multi-sentence narrations sentence by sentence, this many at once, and
+    # join the MP3 segments; each sentence is cached on its own.
+    tts_sentence_split: bool = False
+    tts_sentence_concurrency: int = 3
+    # TTS engines in preference order: "edge" (online MP3) and/or "local" (offline WAV).
+    tts_backends: List[str] = ["edge"]
+    # "ordered" keeps the list order; "latency" prefers the fastest healthy backend.
+    tts_backend_selection: Literal["ordered", "latency"] = "ordered"
+    tts_backend_timeout_seconds: float = 10.0
+    tts_local_engine: Literal["espeak", "piper"] = "espeak"
+    tts_local_model_path: Optional[str] = None
+    tts_local_voice: str = "en-us"
+    tts_local_workers: int = 2
+    # Format for clients that do not negotiate one (request field or Accept); None keeps
+    # the backend's own output. Conversions need ffmpeg (TTS_FFMPEG_PATH or on PATH).
+    tts_audio_format: Optional[Literal["mp3", "mp3-low", "opus"]] = None
+    tts_ffmpeg_path: Optional[str] = None
+    tts_cache_enabled: bool = True
+    tts_cache_max_entries: int = 256
+    tts_cache_max_bytes: int = 32 * 1024 * 1024
+    tts_cache_dir: Optional[str] = None
+    tts_cache_disk_max_bytes: int = 256 * 1024 * 1024
+
+    # /api/v1/conversation/ws: open sockets beyond the cap are closed with 1013, and a socket
+    # is dropped if a frame cannot be sent within the timeout.
+    ws_max_connections: int = 200
+    ws_send_timeout_seconds: float = 10.0
+
+    session_backend: Literal["memory", "sqlite", "redis"] = "memory"
+    session_sqlite_path: str = "bmo-sessions.db"
+    session_redis_url: str = "redis://localhost:6379/0"
+    session_flush_interval_seconds: float = 0.05
+    session_flush_batch_size: int = 64
+    session_ttl_seconds: float = 1800.0
+    session_max_sessions: int = 1000
+    session_max_messages: int = 20
+    session_max_tokens: int = 2000
+    session_summarize_dropped: bool = True
+    session_shards: int = 16
+    session_sweep_interval_seconds: float = 60.0
+
+    local_navigation_enabled: bool = True
+
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 512
+    response_cache_ttl_seconds: float = 3600.0
+    # Precomputed answers and audio from `python -m app.build_bundle`; memory-mapped at startup.
+    answer_bundle_path: Optional[str] = None
+
     default_greeting: str = (
         "Hey there! I’m BMO, broadcasting from the Central Library. Ask me about any building or shortcut."
     )
@@ -80,6 +222,12 @@ class Settings(BaseSettings):
 
         return [origin.strip() for origin in cleaned.split(",") if origin.strip()]
 
+    @model_validator(mode="after")
+    def check_admission_default_class(self):
+        if self.admission_default_class not in self.admission_classes:
+            raise ValueError(f"ADMISSION_DEFAULT_CLASS {self.admission_default_class!r} is not in ADMISSION_CLASSES")
+        return self
+
     @model_validator(mode="after")
     def ensure_app_url_allowed(self):
         if not self.app_url:
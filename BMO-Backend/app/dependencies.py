@@ -1,20 +1,92 @@
+import logging
 from functools import lru_cache
+from typing import Optional
 
 from app.core.config import get_settings
-from app.services.conversation import ConversationService
+from app.services.admission import AdmissionScheduler
+from app.services.answer_bundle import AnswerBundle
+from app.services.concurrency import Bulkhead, ConcurrencyLimits, SingleFlight
+from app.services.conversation import SYSTEM_PROMPT, ConversationService
+from app.services.map_loader import MapLoader
+from app.services.metrics import Metrics
+from app.services.model_health import CircuitBreaker, ModelHealthRegistry
+from app.services.model_stats import LatencyTracker
 from app.services.openrouter import OpenRouterClient
-from app.services.session_store import SessionStore
+from app.services.response_cache import ResponseCache
+from app.services.session_redis import RedisSessionStore
+from app.services.session_sqlite import SQLiteSessionStore
+from app.services.session_store import SessionBackend, SessionStore
 from app.services.speech import SpeechService
+from app.services.tts_backends import build_backends
+from app.services.tts_cache import AudioCache
+from app.services.turns import TurnRegistry
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_metrics() -> Metrics:
+    return Metrics()
+
+
+@lru_cache()
+def get_session_store() -> SessionBackend:
+    settings = get_settings()
+    common = {
+        "ttl_seconds": settings.session_ttl_seconds,
+        "max_sessions": settings.session_max_sessions,
+        "max_messages": settings.session_max_messages,
+        "max_tokens": settings.session_max_tokens,
+        "summarize_dropped": settings.session_summarize_dropped,
+    }
+    batching = {
+        "flush_interval_seconds": settings.session_flush_interval_seconds,
+        "flush_batch_size": settings.session_flush_batch_size,
+    }
+    if settings.session_backend == "sqlite":
+        return SQLiteSessionStore(settings.session_sqlite_path, **common, **batching)
+    if settings.session_backend == "redis":
+        return RedisSessionStore(settings.session_redis_url, **common, **batching)
+    return SessionStore(**common, shards=settings.session_shards)
+
+
+@lru_cache()
+def get_tts_cache() -> Optional[AudioCache]:
+    settings = get_settings()
+    if not settings.tts_cache_enabled:
+        return None
+    return AudioCache(
+        max_entries=settings.tts_cache_max_entries,
+        max_bytes=settings.tts_cache_max_bytes,
+        disk_dir=settings.tts_cache_dir,
+        disk_max_bytes=settings.tts_cache_disk_max_bytes,
+    )
 
 
 @lru_cache()
-def get_session_store() -> SessionStore:
-    return SessionStore()
+def get_answer_bundle() -> Optional[AnswerBundle]:
+    path = get_settings().answer_bundle_path
+    if not path:
+        return None
+    try:
+        return AnswerBundle(path)
+    except (OSError, ValueError) as exc:
+        # Serve without it rather than refuse to boot the kiosk.
+        logger.warning("Answer bundle %s not loaded: %s", path, exc)
+        return None
 
 
 @lru_cache()
 def get_speech_service() -> SpeechService:
-    return SpeechService(get_settings())
+    settings = get_settings()
+    return SpeechService(
+        settings,
+        cache=get_tts_cache(),
+        flights=SingleFlight() if settings.single_flight_enabled else None,
+        metrics=get_metrics(),
+        backends=build_backends(settings),
+        bundle=get_answer_bundle(),
+    )
 
 
 @lru_cache()
@@ -22,10 +94,122 @@ def get_openrouter_client() -> OpenRouterClient:
     return OpenRouterClient(get_settings())
 
 
+@lru_cache()
+def get_response_cache() -> Optional[ResponseCache]:
+    settings = get_settings()
+    if not settings.response_cache_enabled:
+        return None
+    return ResponseCache(
+        max_entries=settings.response_cache_max_entries,
+        ttl_seconds=settings.response_cache_ttl_seconds,
+    )
+
+
+@lru_cache()
+def get_latency_tracker() -> LatencyTracker:
+    return LatencyTracker()
+
+
+@lru_cache()
+def get_stage_latency() -> LatencyTracker:
+    return LatencyTracker(window=200)
+
+
+@lru_cache()
+def get_model_health() -> ModelHealthRegistry:
+    settings = get_settings()
+    return ModelHealthRegistry(
+        lambda: CircuitBreaker(
+            window=settings.model_breaker_window,
+            min_calls=settings.model_breaker_min_calls,
+            failure_rate_threshold=settings.model_breaker_failure_rate,
+            open_seconds=settings.model_breaker_open_seconds,
+            slow_call_seconds=settings.model_breaker_slow_call_seconds,
+        )
+    )
+
+
+@lru_cache()
+def get_map_loader() -> MapLoader:
+    settings = get_settings()
+    return MapLoader(
+        system_prompt=SYSTEM_PROMPT,
+        map_mode=settings.prompt_map_mode,
+        context_turns=settings.prompt_slice_context_turns,
+        poll_interval_seconds=settings.map_poll_interval_seconds,
+    )
+
+
+@lru_cache()
+def get_llm_limits() -> ConcurrencyLimits:
+    settings = get_settings()
+    return ConcurrencyLimits(
+        max_concurrency=settings.llm_max_concurrency,
+        max_queue=settings.llm_max_queue,
+        max_concurrency_per_model=settings.llm_max_concurrency_per_model,
+        max_queue_per_model=settings.llm_max_queue_per_model,
+        queue_timeout_seconds=settings.llm_queue_timeout_seconds,
+        retry_after_seconds=settings.overload_retry_after_seconds,
+    )
+
+
+@lru_cache()
+def get_ws_connections() -> Bulkhead:
+    settings = get_settings()
+    return Bulkhead(
+        "websocket",
+        limit=settings.ws_max_connections,
+        max_queue=0,
+        retry_after_seconds=settings.overload_retry_after_seconds,
+    )
+
+
+@lru_cache()
+def get_admission_scheduler() -> Optional[AdmissionScheduler]:
+    settings = get_settings()
+    if not settings.admission_enabled:
+        return None
+    return AdmissionScheduler(
+        settings.admission_classes,
+        max_concurrency=settings.admission_max_concurrency,
+        queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+        degrade_utilization=settings.admission_degrade_utilization,
+        retry_after_seconds=settings.overload_retry_after_seconds,
+        default_class=settings.admission_default_class,
+        class_header=settings.admission_class_header,
+        api_key_header=settings.admission_api_key_header,
+        trust_header=settings.admission_trust_header,
+        api_keys=settings.admission_api_keys,
+        metrics=get_metrics(),
+    )
+
+
+@lru_cache()
+def get_turn_registry() -> TurnRegistry:
+    return TurnRegistry(get_metrics())
+
+
+@lru_cache()
+def get_chat_flights() -> Optional[SingleFlight]:
+    if not get_settings().single_flight_enabled:
+        return None
+    return SingleFlight()
+
+
 def get_conversation_service() -> ConversationService:
     return ConversationService(
         settings=get_settings(),
         session_store=get_session_store(),
         openrouter=get_openrouter_client(),
         speech_service=get_speech_service(),
+        response_cache=get_response_cache(),
+        latency_tracker=get_latency_tracker(),
+        model_health=get_model_health(),
+        map_loader=get_map_loader(),
+        llm_limits=get_llm_limits(),
+        chat_flights=get_chat_flights(),
+        stage_latency=get_stage_latency(),
+        metrics=get_metrics(),
+        turns=get_turn_registry(),
+        answer_bundle=get_answer_bundle(),
     )
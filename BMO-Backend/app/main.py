@@ -1,10 +1,70 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from app.api.routes import conversation, transcription
+from app.api.routes import audio, conversation, diagnostics, metrics, transcription
+from app.core.compression import CompressionMiddleware
 from app.core.config import get_settings
+from app.dependencies import (
+    get_answer_bundle,
+    get_map_loader,
+    get_openrouter_client,
+    get_session_store,
+    get_speech_service,
+)
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+async def prewarm_speech() -> None:
+    speech = get_speech_service()
+    await speech.start()
+    try:
+        await speech.prewarm([settings.default_greeting])
+    except Exception as exc:  # pragma: no cover - edge-tts may be unreachable at boot
+        logger.warning("TTS cache pre-warm failed: %s", exc)
+
+
+async def prewarm_openrouter() -> None:
+    try:
+        await get_openrouter_client().prewarm()
+    except Exception as exc:  # pragma: no cover - OpenRouter may be unreachable at boot
+        logger.warning("OpenRouter connection pre-warm failed: %s", exc)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    openrouter = get_openrouter_client()
+    bundle = get_answer_bundle()
+    if bundle is not None:
+        info = bundle.snapshot()
+        logger.info("Answer bundle loaded: %d answers, %d clips", info["answers"], info["clips"])
+        if bundle.map_hash != get_map_loader().current.content_hash:
+            logger.warning("Answer bundle was built for another campus map; only its audio will be used")
+    prewarm_tasks = [asyncio.create_task(prewarm_speech())]
+    if settings.openrouter_prewarm:
+        prewarm_tasks.append(asyncio.create_task(prewarm_openrouter()))
+    session_store = get_session_store()
+    session_store.start_sweeper(settings.session_sweep_interval_seconds)
+    map_loader = get_map_loader()
+    if settings.map_reload_enabled:
+        map_loader.start_watching()
+    yield
+    await map_loader.stop_watching()
+    for task in prewarm_tasks:
+        task.cancel()
+    await session_store.aclose()
+    await get_speech_service().aclose()
+    await openrouter.aclose()
+    get_openrouter_client.cache_clear()
+    if bundle is not None:
+        bundle.close()
+        get_answer_bundle.cache_clear()
 
 allow_all_origins = "*" in settings.cors_origins
 
@@ -14,6 +74,9 @@ app = FastAPI(
     version=settings.app_version,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    # orjson serializes a /respond body (mostly base64 audio) several times faster.
+    default_response_class=ORJSONResponse,
 )
 
 cors_kwargs = (
@@ -30,8 +93,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.response_compression_enabled:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.response_compression_min_bytes)
+
 app.include_router(conversation.router)
+app.include_router(audio.router)
 app.include_router(transcription.router)
+app.include_router(diagnostics.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health", tags=["health"])
@@ -1,23 +1,38 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 
-class WakeResponse(BaseModel):
-    session_id: str
-    message: str
-
-
 class RespondRequest(BaseModel):
     session_id: str = Field(..., description="Conversation session identifier")
     transcript: str = Field(..., description="Transcribed user speech or typed command")
+    audio_delivery: Optional[Literal["inline", "url", "both"]] = Field(
+        None,
+        description="`inline` embeds base64 MP3, `url` returns an audio URL to fetch, `both` does both",
+    )
+    audio_format: Optional[Literal["mp3", "mp3-low", "opus"]] = Field(
+        None,
+        description=(
+            "`mp3` (24 kHz mono, 48 kbit/s), `mp3-low` (24 kbit/s) or `opus` (WebM, 16 kbit/s); "
+            "overrides audio types in the Accept header. `speech.mime_type` reports what was sent"
+        ),
+    )
 
 
 class SpeechPayload(BaseModel):
     mime_type: str
-    base64: str
+    backend: Optional[str] = Field(None, description="TTS backend that produced the clip")
+    base64: Optional[str] = None
+    audio_id: Optional[str] = None
+    url: Optional[str] = None
+
+
+class WakeResponse(BaseModel):
+    session_id: str
+    message: str
+    speech: Optional[SpeechPayload] = None
 
 
 class RespondPayload(BaseModel):
@@ -27,4 +42,5 @@ class RespondPayload(BaseModel):
     destination: str
     directions: List[str]
     mode: str
-    speech: SpeechPayload
+    # Omitted when the admission scheduler degraded the turn to text only.
+    speech: Optional[SpeechPayload] = None
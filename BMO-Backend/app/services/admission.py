@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Deque, Dict, Mapping, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import AdmissionClass
+from app.services.concurrency import Overloaded
+from app.services.metrics import Metrics
+
+Degradation = Tuple[str, ...]
+
+
+class RateLimited(HTTPException):
+    """429 for a client class that has used up its token bucket."""
+
+    def __init__(self, client_class: str, retry_after: int) -> None:
+        super().__init__(
+            status_code=429,
+            detail=f"Too many requests from {client_class} clients. Please retry in a moment.",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.client_class = client_class
+
+
+class TokenBucket:
+    """`rate` tokens per second up to `burst`; a rate of 0 never runs dry."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def retry_after(self) -> int:
+        if self.rate <= 0:
+            return 0
+        return max(1, math.ceil((1 - self._tokens) / self.rate))
+
+
+class _Waiter:
+    __slots__ = ("future", "start", "finish")
+
+    def __init__(self, future: asyncio.Future, start: float, finish: float) -> None:
+        self.future = future
+        self.start = start
+        self.finish = finish
+
+
+class _ClassState:
+    def __init__(self, config: AdmissionClass) -> None:
+        self.config = config
+        self.bucket = TokenBucket(config.rate_per_second, config.burst)
+        self.queue: Deque[_Waiter] = deque()
+        self.last_finish = 0.0
+        self.active = 0
+        self.outcomes: Counter = Counter()
+
+
+class AdmissionScheduler:
+    """Admits conversation turns by client class with weighted fair queuing.
+
+    A free slot goes to the waiting request with the smallest virtual finish time
+    (start + 1/weight), so under contention each class gets slots in proportion to
+    its weight. Each class has its own token bucket and queue-depth limit. Once
+    `degrade_utilization` of the slots are busy, classes with a `degrade` list are
+    admitted without their expensive parts (a cheaper model, no audio) before any
+    slot has to be waited for.
+    """
+
+    def __init__(
+        self,
+        classes: Mapping[str, AdmissionClass],
+        *,
+        max_concurrency: int = 16,
+        queue_timeout_seconds: float = 10.0,
+        degrade_utilization: float = 0.75,
+        retry_after_seconds: int = 2,
+        default_class: str = "web",
+        class_header: str = "X-BMO-Client-Class",
+        api_key_header: str = "X-BMO-API-Key",
+        trust_header: bool = False,
+        api_keys: Optional[Mapping[str, str]] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self.limit = max(1, max_concurrency)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.degrade_utilization = degrade_utilization
+        self.retry_after_seconds = retry_after_seconds
+        self.default_class = default_class
+        self.class_header = class_header
+        self.api_key_header = api_key_header
+        self.trust_header = trust_header
+        self.api_keys = dict(api_keys or {})
+        self.metrics = metrics or Metrics()
+        self._classes = {name: _ClassState(config) for name, config in classes.items()}
+        self._virtual = 0.0
+        self.active = 0
+
+    def classify(self, headers: Mapping[str, str]) -> str:
+        """Client class from the API key header, else the class header if trusted, else the default."""
+        key = headers.get(self.api_key_header)
+        if key and key in self.api_keys and self.api_keys[key] in self._classes:
+            return self.api_keys[key]
+        if self.trust_header:
+            requested = (headers.get(self.class_header) or "").strip().lower()
+            if requested in self._classes:
+                return requested
+        return self.default_class
+
+    @asynccontextmanager
+    async def admit(self, client_class: str) -> AsyncIterator[Degradation]:
+        """Hold a slot for one turn; yields the degradations to apply to it."""
+        state = self._classes[client_class]
+        if not state.bucket.take():
+            self._count(state, client_class, "rate_limited")
+            raise RateLimited(client_class, state.bucket.retry_after())
+        degrade: Degradation = tuple(state.config.degrade) if self._under_pressure() else ()
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+        else:
+            await self._wait(state, client_class)
+            degrade = tuple(state.config.degrade)
+        state.active += 1
+        self._count(state, client_class, "degraded" if degrade else "admitted")
+        try:
+            yield degrade
+        finally:
+            state.active -= 1
+            self.active -= 1
+            self._dispatch()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(state.queue) for state in self._classes.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "classes": {
+                name: {
+                    "weight": state.config.weight,
+                    "active": state.active,
+                    "waiting": len(state.queue),
+                    "max_queue": state.config.max_queue,
+                    **state.outcomes,
+                }
+                for name, state in self._classes.items()
+            },
+        }
+
+    def _under_pressure(self) -> bool:
+        return self.waiting > 0 or self.active + 1 > self.limit * self.degrade_utilization
+
+    async def _wait(self, state: _ClassState, client_class: str) -> None:
+        if len(state.queue) >= state.config.max_queue:
+            self._count(state, client_class, "rejected")
+            raise Overloaded(f"{client_class} queue", self.retry_after_seconds)
+        start = max(self._virtual, state.last_finish)
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), start, start + 1 / max(state.config.weight, 1e-6))
+        state.last_finish = waiter.finish
+        state.queue.append(waiter)
+        self._count(state, client_class, "queued")
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we gave up: hand the slot on.
+                self.active -= 1
+                self._dispatch()
+            else:
+                waiter.future.cancel()
+                state.queue.remove(waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self._count(state, client_class, "timed_out")
+            raise Overloaded(f"{client_class} queue", self.retry_after_seconds) from None
+
+    def _dispatch(self) -> None:
+        while self.active < self.limit:
+            heads = [state.queue[0] for state in self._classes.values() if state.queue]
+            if not heads:
+                return
+            waiter = min(heads, key=lambda head: head.finish)
+            for state in self._classes.values():
+                if state.queue and state.queue[0] is waiter:
+                    state.queue.popleft()
+                    break
+            self._virtual = waiter.start
+            self.active += 1
+            waiter.future.set_result(None)
+
+    def _count(self, state: _ClassState, client_class: str, outcome: str) -> None:
+        state.outcomes[outcome] += 1
+        self.metrics.admissions.inc(client_class, outcome)
+
+
+def admit_client(
+    scheduler: Optional[AdmissionScheduler], headers: Mapping[str, str]
+) -> AsyncContextManager[Degradation]:
+    """`scheduler.admit` for the caller's class; a no-op when admission control is off."""
+    if scheduler is None:
+        return nullcontext(())
+    return scheduler.admit(scheduler.classify(headers))
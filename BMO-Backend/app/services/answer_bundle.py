@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+# File layout: header (magic, index length), JSON index, then the payload and audio blobs.
+# Index offsets are relative to the first blob byte.
+MAGIC = b"BMOBNDL1"
+HEADER = struct.Struct("<8sQ")
+FORMAT_VERSION = 1
+
+
+def write_bundle(
+    path: Union[str, Path],
+    *,
+    answers: Mapping[str, Dict[str, Any]],
+    clips: Mapping[str, bytes],
+    map_hash: str,
+    voice: str,
+) -> int:
+    """Write a bundle atomically; returns its size in bytes.
+
+    `answers` maps a normalized query to its payload and `clips` maps audio cache keys
+    to audio bytes. Queries with identical payloads share a blob.
+    """
+    blobs: List[bytes] = []
+    size = 0
+    payload_offsets: Dict[bytes, List[int]] = {}
+    index: Dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "map_hash": map_hash,
+        "voice": voice,
+        "built_at": time.time(),
+        "answers": {},
+        "clips": {},
+    }
+
+    def add(blob: bytes) -> List[int]:
+        nonlocal size
+        blobs.append(blob)
+        size += len(blob)
+        return [size - len(blob), len(blob)]
+
+    for audio_key, audio in clips.items():
+        index["clips"][audio_key] = add(audio)
+    for query, payload in answers.items():
+        blob = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        if blob not in payload_offsets:
+            payload_offsets[blob] = add(blob)
+        index["answers"][query] = payload_offsets[blob]
+
+    encoded_index = json.dumps(index, ensure_ascii=False).encode("utf-8")
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    with temporary.open("wb") as handle:
+        handle.write(HEADER.pack(MAGIC, len(encoded_index)))
+        handle.write(encoded_index)
+        for blob in blobs:
+            handle.write(blob)
+    os.replace(temporary, path)
+    return HEADER.size + len(encoded_index) + size
+
+
+class AnswerBundle:
+    """Read-only view of a bundle built by `python -m app.build_bundle`.
+
+    The file is memory-mapped; `clip` returns a memoryview into the mapping, so audio
+    goes from the page cache to the socket without being copied into the heap. Only
+    the JSON index is parsed at load time.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not an answer bundle")
+        index = json.loads(self._mmap[HEADER.size : HEADER.size + index_length])
+        if index.get("version") != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} has unsupported bundle version {index.get('version')}")
+        self._view = memoryview(self._mmap)
+        self._data = HEADER.size + index_length
+        self._answers: Dict[str, List[int]] = index["answers"]
+        self._clips: Dict[str, List[int]] = index["clips"]
+        self.map_hash: str = index["map_hash"]
+        self.voice: str = index["voice"]
+        self.built_at: float = index["built_at"]
+        self.answer_hits = 0
+        self.clip_hits = 0
+
+    def answer(self, query: str, map_hash: str) -> Optional[Dict[str, Any]]:
+        """A fresh copy of the precomputed payload for a normalized query, if built for this map."""
+        entry = self._answers.get(query)
+        if entry is None or map_hash != self.map_hash:
+            return None
+        self.answer_hits += 1
+        return json.loads(self._slice(*entry).tobytes())
+
+    def clip(self, audio_key: str) -> Optional[memoryview]:
+        entry = self._clips.get(audio_key)
+        if entry is None:
+            return None
+        self.clip_hits += 1
+        return self._slice(*entry)
+
+    def close(self) -> None:
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            # A clip is still being sent; the mapping is unmapped once it is released.
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "bytes": len(self._mmap),
+            "map_hash": self.map_hash,
+            "voice": self.voice,
+            "built_at": self.built_at,
+            "answers": len(self._answers),
+            "clips": len(self._clips),
+            "answer_hits": self.answer_hits,
+            "clip_hits": self.clip_hits,
+        }
+
+    def _slice(self, offset: int, length: int) -> memoryview:
+        start = self._data + offset
+        return self._view[start : start + length]
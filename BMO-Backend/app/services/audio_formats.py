@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import shutil
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Literal, Optional, Tuple
+
+from app.services.tts_backends import audio_mime_type
+
+logger = logging.getLogger(__name__)
+
+AudioFormatName = Literal["mp3", "mp3-low", "opus"]
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    name: str
+    mime_type: str
+    bitrate_kbps: int
+    # Clips already in one of these types are served as they are.
+    passthrough: FrozenSet[str]
+    ffmpeg_args: Tuple[str, ...]
+
+
+AUDIO_FORMATS: Dict[str, AudioFormat] = {
+    # What edge-tts produces: 24 kHz mono MP3 at 48 kbit/s.
+    "mp3": AudioFormat(
+        "mp3",
+        "audio/mpeg",
+        48,
+        frozenset({"audio/mpeg"}),
+        ("-ar", "24000", "-ac", "1", "-c:a", "libmp3lame", "-b:a", "48k", "-f", "mp3"),
+    ),
+    "mp3-low": AudioFormat(
+        "mp3-low",
+        "audio/mpeg",
+        24,
+        frozenset(),
+        ("-ar", "24000", "-ac", "1", "-c:a", "libmp3lame", "-b:a", "24k", "-f", "mp3"),
+    ),
+    "opus": AudioFormat(
+        "opus",
+        "audio/webm",
+        16,
+        frozenset(),
+        ("-ar", "24000", "-ac", "1", "-c:a", "libopus", "-b:a", "16k", "-application", "voip", "-f", "webm"),
+    ),
+}
+
+# Accept header media types and the format each one selects.
+_ACCEPTED_TYPES = {"audio/webm": "opus", "audio/mpeg": "mp3", "audio/mp3": "mp3"}
+
+
+def negotiate_audio_format(
+    requested: Optional[str], accept: Optional[str], default: Optional[str] = None
+) -> Optional[str]:
+    """The explicit request field wins, then the best audio type in Accept, then `default`.
+
+    None means the backend's own output, unconverted.
+    """
+    if requested:
+        return requested
+    best: Optional[str] = None
+    best_quality = 0.0
+    for media_range in (accept or "").split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        name = _ACCEPTED_TYPES.get(media_type.lower())
+        if name is None:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best or default
+
+
+class AudioTranscoder:
+    """Re-encodes clips into a client-selected format with ffmpeg.
+
+    Without an ffmpeg binary, clips are returned unchanged; their MIME type is
+    always read from the bytes, so clients are never told a format they did not get.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, timeout_seconds: float = 10.0) -> None:
+        self.binary = ffmpeg_path or shutil.which("ffmpeg")
+        self.timeout_seconds = timeout_seconds
+        if self.binary is None:
+            logger.info("ffmpeg not found; clips are served in the TTS backend's own format")
+
+    @property
+    def available(self) -> bool:
+        return self.binary is not None
+
+    def needs_transcoding(self, audio: bytes, audio_format: str) -> bool:
+        return self.available and audio_mime_type(audio) not in AUDIO_FORMATS[audio_format].passthrough
+
+    async def transcode(self, audio: bytes, audio_format: str) -> bytes:
+        """`audio` in `audio_format`; raises RuntimeError if ffmpeg fails."""
+        if not self.needs_transcoding(audio, audio_format):
+            return audio
+        process = await asyncio.create_subprocess_exec(
+            self.binary,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            "pipe:0",
+            *AUDIO_FORMATS[audio_format].ffmpeg_args,
+            "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            output, errors = await asyncio.wait_for(process.communicate(bytes(audio)), self.timeout_seconds)
+        except BaseException:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0 or not output:
+            detail = errors.decode("utf-8", "replace").strip()[-200:]
+            raise RuntimeError(f"ffmpeg exited with {process.returncode}: {detail}")
+        return output
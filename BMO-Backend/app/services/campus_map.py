@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+_BUILDING_REF = re.compile(
+    r"\((?:Building|Bldg)s?\.?\s*(?P<numbers>[\d\s,&–\-and]+)\)", re.IGNORECASE
+)
+_LABELLED_BULLET = re.compile(r"^\s*[-*]\s*\*\*(?P<label>[^*]+?):?\*\*:?\s*(?P<body>.+)$")
+_BARE_BUILDINGS = re.compile(
+    r"\b(?:Building|Bldg)s?\.?\s*(?P<numbers>\d+(?:\s*(?:[–\-]|&|,|and)\s*\d+)*)", re.IGNORECASE
+)
+_HOSTS = re.compile(r"\bhosts?\s+(?P<names>[^.]+)", re.IGNORECASE)
+_NAME_SEPARATORS = re.compile(r"[,:;—–]|\*\*|\s-\s")
+_PART_SEPARATORS = re.compile(r"\s*(?:&|\+|\band\b|/)\s*")
+_REVERSED_REF = re.compile(
+    r"\b(?:Building|Bldg)\.?\s*(?P<number>\d+)\s*\((?P<name>[A-Za-z][A-Za-z &]*)\)", re.IGNORECASE
+)
+_ZONE_LABEL = re.compile(
+    r"^\s*(?:[-*]\s*)?(?:\*\*)?(?P<label>[^:*]*\bZone\b[^:*]*?)(?:\*\*)?:(?:\*\*)?(?P<body>.*)$",
+    re.IGNORECASE,
+)
+_ZONE_COLOR = re.compile(r"\b(?P<color>[A-Za-z]+)\s+Zone\b", re.IGNORECASE)
+_COMPASS = re.compile(r"\b(north|south|east|west)(?:[- ](north|south|east|west))?\b", re.IGNORECASE)
+_LEADING_FILLER = re.compile(r"^(?:(?:the|plus|and)\s+)+", re.IGNORECASE)
+_PROPER_NAME = re.compile(r"^[A-Z][\w'-]*(?:\s+(?:&\s+)?[A-Z][\w'-]*)*")
+_BULLET = re.compile(r"^\s*[-*]\s+\S")
+
+
+@dataclass(frozen=True)
+class Zone:
+    color: str
+    direction: Optional[str]
+    buildings: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class Building:
+    number: int
+    name: Optional[str]
+    zone: Optional[str]
+    direction: Optional[str]
+
+
+@dataclass(frozen=True)
+class CampusMap:
+    text: str
+    content_hash: str
+    aliases: Dict[str, Tuple[int, ...]] = field(default_factory=dict)
+    zones: Dict[str, Zone] = field(default_factory=dict)
+    buildings: Dict[int, Building] = field(default_factory=dict)
+    anchor: int = 3
+
+    @cached_property
+    def _alias_pattern(self) -> Optional["re.Pattern[str]"]:
+        if not self.aliases:
+            return None
+        # Longest aliases first so "sports hall" wins over "hall".
+        ordered = sorted(self.aliases, key=len, reverse=True)
+        return re.compile(r"\b(?:%s)\b" % "|".join(re.escape(alias) for alias in ordered))
+
+    def substitute_aliases(self, text: str) -> str:
+        """Rewrite known aliases in lower-cased text as "building N [M ...]"."""
+        if self._alias_pattern is None:
+            return text
+        return self._alias_pattern.sub(
+            lambda match: "building " + " ".join(str(n) for n in self.aliases[match.group(0)]),
+            text,
+        )
+
+    @cached_property
+    def _entries(self) -> List[Tuple[str, FrozenSet[int], FrozenSet[str]]]:
+        """Bullet lines of the map with the buildings and zone colours each one mentions."""
+        entries = []
+        for line in self.text.splitlines():
+            if not _BULLET.match(line):
+                continue
+            zones = frozenset(match.group("color").title() for match in _ZONE_COLOR.finditer(line))
+            entries.append((line.strip(), frozenset(_mentioned_buildings(line)), zones))
+        return entries
+
+    def excerpt(self, numbers: Iterable[int], zones: Iterable[str]) -> Optional[str]:
+        """Map lines about the given buildings and zones (plus the anchor), or None if none match."""
+        wanted_numbers = set(numbers)
+        wanted_zones = {zone.title() for zone in zones}
+        # A building's zone line carries the direction from the anchor.
+        wanted_zones.update(
+            self.buildings[number].zone for number in wanted_numbers if number in self.buildings
+        )
+        matched = [
+            line
+            for line, mentioned, line_zones in self._entries
+            if mentioned & wanted_numbers or line_zones & wanted_zones
+        ]
+        if not matched:
+            return None
+        anchor = [
+            line for line, mentioned, _ in self._entries if self.anchor in mentioned and line not in matched
+        ]
+        return "\n".join(anchor + matched)
+
+    def route_to(self, number: int) -> Optional[List[str]]:
+        """Step-by-step directions from the anchor, or None if the map is not explicit enough."""
+        building = self.buildings.get(number)
+        if building is None or building.zone is None:
+            return None
+        if number == self.anchor:
+            return [f"You are already at Building {self.anchor}, the Central Library."]
+        direction = building.direction or self.zones[building.zone].direction
+        steps = [f"Start at the Central Library (Building {self.anchor})."]
+        if direction:
+            steps.append(f"Walk {direction} into the {building.zone} Zone.")
+        else:
+            steps.append(f"Walk to the {building.zone} Zone.")
+        label = f"Building {number}" + (f" ({building.name})" if building.name else "")
+        steps.append(f"Look for the signs for {label}.")
+        steps.append("Use on-site signage once you reach the zone perimeter.")
+        return steps
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_campus_map(text: str) -> CampusMap:
+    candidates: Dict[str, set] = {}
+    names: Dict[int, str] = {}
+    zone_of: Dict[int, str] = {}
+    direction_of: Dict[int, str] = {}
+    zones: Dict[str, Zone] = {}
+
+    for line in text.splitlines():
+        named = list(_named_buildings(line))
+        for name, numbers in named:
+            for alias in _alias_variants(name):
+                candidates.setdefault(alias, set()).add(numbers)
+            for number in numbers:
+                # Prefer names that identify a single building ("Pharmacy" over "Medical Strip").
+                if number not in names or len(numbers) == 1:
+                    names[number] = _display_name(name)
+
+        mentioned = _mentioned_buildings(line)
+        zone = _zone_of_line(line, mentioned)
+        if zone is not None:
+            zones[zone.color] = zone
+            for number in zone.buildings:
+                zone_of.setdefault(number, zone.color)
+        elif "library" in line.lower():
+            compass = _COMPASS.search(line)
+            if compass:
+                for number in mentioned:
+                    direction_of.setdefault(number, compass.group(0).lower())
+
+    # An alias that points at different building groups ("engineering") is ambiguous.
+    aliases = {
+        alias: next(iter(groups))
+        for alias, groups in candidates.items()
+        if len(groups) == 1
+    }
+    anchor = (aliases.get("library") or aliases.get("central library") or (3,))[0]
+    # The map calls the anchor plain "the library" throughout, and so do visitors.
+    if "library" not in candidates:
+        aliases["library"] = (anchor,)
+
+    # Only a zone line that lists a building places it in that zone. A compass direction
+    # alone ("west of the library") is not enough: such buildings are left to the LLM.
+    buildings: Dict[int, Building] = {}
+    for number in sorted(set(names) | set(zone_of) | set(direction_of)):
+        direction = direction_of.get(number)
+        zone = zone_of.get(number)
+        if number == anchor:
+            zone = zone or "Central"
+        buildings[number] = Building(number, names.get(number), zone, direction)
+
+    return CampusMap(
+        text=text,
+        content_hash=content_hash(text),
+        aliases=aliases,
+        zones=zones,
+        buildings=buildings,
+        anchor=anchor,
+    )
+
+
+def parse_building_numbers(raw: str) -> Tuple[int, ...]:
+    range_match = re.fullmatch(r"\s*(\d+)\s*[–\-]\s*(\d+)\s*", raw)
+    if range_match:
+        start, end = int(range_match.group(1)), int(range_match.group(2))
+        return tuple(range(start, end + 1))
+    return tuple(int(number) for number in re.findall(r"\d+", raw))
+
+
+def _mentioned_buildings(line: str) -> Tuple[int, ...]:
+    numbers: List[int] = []
+    for pattern in (_BUILDING_REF, _BARE_BUILDINGS):
+        for match in pattern.finditer(line):
+            numbers.extend(parse_building_numbers(match.group("numbers")))
+    numbers.extend(int(match.group("number")) for match in _REVERSED_REF.finditer(line))
+    return tuple(dict.fromkeys(numbers))
+
+
+def _zone_of_line(line: str, mentioned: Tuple[int, ...]) -> Optional[Zone]:
+    labelled = _ZONE_LABEL.match(line)
+    if not labelled:
+        return None
+    color = _ZONE_COLOR.search(labelled.group("label"))
+    if not color:
+        return None
+    compass = _COMPASS.search(labelled.group("label"))
+    direction = compass.group(0).lower() if compass else None
+    return Zone(color=color.group("color").title(), direction=direction, buildings=mentioned)
+
+
+def _display_name(name: str) -> str:
+    return _LEADING_FILLER.sub("", name.strip(" .*-")).strip()
+
+
+def _named_buildings(line: str) -> Iterable[Tuple[str, Tuple[int, ...]]]:
+    for match in _REVERSED_REF.finditer(line):
+        yield match.group("name"), (int(match.group("number")),)
+
+    cursor = 0
+    found = False
+    for match in _BUILDING_REF.finditer(line):
+        preceding = line[cursor : match.start()]
+        cursor = match.end()
+        name = _NAME_SEPARATORS.split(preceding)[-1]
+        numbers = parse_building_numbers(match.group("numbers"))
+        if numbers and name.strip():
+            found = True
+            yield name, numbers
+    if found:
+        return
+
+    bullet = _LABELLED_BULLET.match(line)
+    if not bullet or "zone" in bullet.group("label").lower():
+        return
+    bare = _BARE_BUILDINGS.search(bullet.group("body"))
+    if not bare:
+        return
+    numbers = parse_building_numbers(bare.group("numbers"))
+    if not numbers:
+        return
+    yield bullet.group("label"), numbers
+
+    # "Buildings 4–6 host Medicine, Dentistry, and Pharmacy" pairs names with numbers.
+    hosted = _HOSTS.search(bullet.group("body"))
+    if hosted:
+        names = []
+        for part in re.split(r",|\band\b", hosted.group("names")):
+            proper = _PROPER_NAME.match(_LEADING_FILLER.sub("", part.strip()))
+            if proper:
+                names.append(proper.group(0))
+        if len(names) == len(numbers):
+            for name, number in zip(names, numbers):
+                yield name, (number,)
+
+
+def _alias_variants(name: str) -> List[str]:
+    cleaned = _LEADING_FILLER.sub("", name.strip(" .*-").lower()).strip()
+    if not cleaned:
+        return []
+    # "Arts & Design" is also said as "arts and design". A bare last word ("hall", "labs")
+    # is not an alias: it names too many places that are not on the map.
+    variants = {cleaned, cleaned.replace("&", "and")}
+    parts = [part for part in _PART_SEPARATORS.split(cleaned) if part]
+    if len(parts) > 1:
+        variants.update(parts)
+    return sorted(variant for variant in variants if len(variant) > 1)
+
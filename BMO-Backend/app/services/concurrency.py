@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, TypeVar
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+# Tasks cancelled because their result is no longer needed (hedge and race losers, the
+# sibling stages of a failed turn) rather than because their turn was cancelled.
+_released: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+
+
+def release(tasks: Iterable[asyncio.Task]) -> None:
+    """Cancel `tasks` without counting them as upstream work abandoned by a cancelled turn."""
+    for task in tasks:
+        if not task.done():
+            _released.add(task)
+            task.cancel()
+
+
+def released() -> bool:
+    """Whether the current task is being cancelled through `release`."""
+    task = asyncio.current_task()
+    return task is not None and task in _released
+
+
+class Overloaded(HTTPException):
+    """503 raised instead of queueing a request behind a full limiter."""
+
+    def __init__(self, scope: str, retry_after: int) -> None:
+        super().__init__(
+            status_code=503,
+            detail=f"BMO is busy right now ({scope} limit reached). Please retry in a moment.",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.scope = scope
+
+
+class Bulkhead:
+    """Semaphore with a bounded wait queue: callers beyond `max_queue` are rejected at once."""
+
+    def __init__(
+        self,
+        scope: str,
+        *,
+        limit: int,
+        max_queue: int,
+        queue_timeout_seconds: float = 10.0,
+        retry_after_seconds: int = 2,
+    ) -> None:
+        self.scope = scope
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        # Counted synchronously: the semaphore only sees callers once they are scheduled.
+        if self.active + self.waiting >= self.limit + self.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.scope, self.retry_after_seconds)
+        self.waiting += 1
+        acquired = False
+        try:
+            async with asyncio.timeout(self.queue_timeout_seconds):
+                await self._semaphore.acquire()
+                acquired = True
+        except BaseException as exc:
+            # The timeout can fire after the permit was granted; hand it back.
+            if acquired:
+                self._semaphore.release()
+            if isinstance(exc, asyncio.TimeoutError):
+                self.timeouts += 1
+                raise Overloaded(self.scope, self.retry_after_seconds) from None
+            raise
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+class ConcurrencyLimits:
+    """A global bulkhead for LLM requests plus one bulkhead per model for upstream calls."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 16,
+        max_queue: int = 32,
+        max_concurrency_per_model: int = 8,
+        max_queue_per_model: int = 16,
+        queue_timeout_seconds: float = 10.0,
+        retry_after_seconds: int = 2,
+    ) -> None:
+        self.max_concurrency_per_model = max_concurrency_per_model
+        self.max_queue_per_model = max_queue_per_model
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.total = Bulkhead(
+            "global",
+            limit=max_concurrency,
+            max_queue=max_queue,
+            queue_timeout_seconds=queue_timeout_seconds,
+            retry_after_seconds=retry_after_seconds,
+        )
+        self._models: Dict[str, Bulkhead] = {}
+
+    def model(self, model: str) -> Bulkhead:
+        if model not in self._models:
+            self._models[model] = Bulkhead(
+                model,
+                limit=self.max_concurrency_per_model,
+                max_queue=self.max_queue_per_model,
+                queue_timeout_seconds=self.queue_timeout_seconds,
+                retry_after_seconds=self.retry_after_seconds,
+            )
+        return self._models[model]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "global": self.total.snapshot(),
+            "models": {model: bulkhead.snapshot() for model, bulkhead in self._models.items()},
+        }
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one shared upstream call.
+
+    Every caller awaits the same task; it is cancelled only when the last waiting
+    caller goes away, so one impatient client cannot fail the others.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._land(key, flight))
+        else:
+            self.shared += 1
+        self.calls += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                if released():
+                    release([flight.task])
+                else:
+                    flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._flights)}
+
+    def _land(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception retrieved even if every waiter has gone.
+            flight.task.exception()
@@ -1,41 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import hashlib
 import json
+import logging
+import time
 import uuid
-import re
-from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Collection, Dict, List, Optional, Tuple
 
 import httpx
 from fastapi import HTTPException
 
 from app.core.config import Settings
+from app.services.answer_bundle import AnswerBundle
+from app.services.concurrency import ConcurrencyLimits, Overloaded, SingleFlight, release, released
+from app.services.model_health import ModelHealthRegistry
+from app.services.model_stats import LatencyTracker, StageTimer
+from app.services.map_loader import MapLoader
+from app.services.metrics import Metrics
 from app.services.openrouter import OpenRouterClient
-from app.services.session_store import SessionStore
-from app.services.speech import SpeechService
+from app.services.response_cache import ResponseCache, normalize_transcript
+from app.services.session_store import SessionBackend
+from app.services.speech import AudioDelivery, SpeechService
+from app.services.llm_json import parse_llm_object
+from app.services.streaming import StreamingField, last_sentence_boundary, split_sentences
+from app.services.tts_backends import audio_mime_type
+from app.services.turns import TurnRegistry
 
-RESOURCE_DIR = Path(__file__).resolve().parents[1] / "resources"
-MAP_FILE = RESOURCE_DIR / "aiu_map.md"
-
-
-def _load_map_context() -> str:
-    fallback = (
-        "### AIU Campus Map\n"
-        "(Update `app/resources/aiu_map.md` to embed the latest aerial map or schematic. "
-        "This block is streamed into the model before every response.)\n\n"
-        "Central anchor: Building 3 (Library).\n"
-        "Yellow Zone (West): Engineering + CS (Bldg 10), Engineering Labs (Bldg 9 & 11), Business & Legal (Bldg 8).\n"
-        "Red Zone (North): Administration spine (Bldg 1), Arts & Design (Bldg 7), Medical Cluster (Bldg 4,5,6).\n"
-        "Blue Zone (East): Hospital (Bldg 15), Housing (Bldg 13 & 14), Sports Hall (Bldg 17).\n"
-    )
-    try:
-        return MAP_FILE.read_text(encoding="utf-8").strip() or fallback
-    except FileNotFoundError:
-        return fallback
-
-
-MAP_CONTEXT = _load_map_context()
+logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT = (
     "### ROLE & PERSONA\n"
@@ -49,7 +42,7 @@ SYSTEM_PROMPT = (
     "### PRIMARY OBJECTIVES\n"
     "1. Hold natural conversations while motors are offline.\n"
     "2. Provide descriptive navigation using landmarks, zones (Yellow/Red/Blue), and library-relative directions.\n"
-    "3. Answer questions about faculties, leadership, and campus life using the knowledge base above.\n\n"
+    "3. Answer questions about faculties, leadership, and campus life using the campus map knowledge base.\n\n"
     "### OUTPUT FORMAT (STRICT JSON)\n"
     "Always emit a **single JSON object** with the keys shown below. Do not include extra commentary outside JSON.\n"
     "{\n"
@@ -78,65 +71,515 @@ class ConversationService:
         self,
         *,
         settings: Settings,
-        session_store: SessionStore,
+        session_store: SessionBackend,
         openrouter: OpenRouterClient,
         speech_service: SpeechService,
+        response_cache: Optional[ResponseCache] = None,
+        latency_tracker: Optional[LatencyTracker] = None,
+        model_health: Optional[ModelHealthRegistry] = None,
+        map_loader: Optional[MapLoader] = None,
+        llm_limits: Optional[ConcurrencyLimits] = None,
+        chat_flights: Optional[SingleFlight] = None,
+        stage_latency: Optional[LatencyTracker] = None,
+        metrics: Optional[Metrics] = None,
+        turns: Optional[TurnRegistry] = None,
+        answer_bundle: Optional[AnswerBundle] = None,
     ) -> None:
         self.settings = settings
         self.session_store = session_store
         self.openrouter = openrouter
         self.speech_service = speech_service
+        self.response_cache = response_cache
+        self.latency_tracker = latency_tracker or LatencyTracker()
+        self.model_health = model_health or ModelHealthRegistry()
+        self.map_loader = map_loader or MapLoader(system_prompt=SYSTEM_PROMPT)
+        # One map version for the whole request, even if a reload lands mid-way.
+        self.map = self.map_loader.current
+        self.llm_limits = llm_limits or ConcurrencyLimits()
+        self.chat_flights = chat_flights
+        self.stage_latency = stage_latency
+        self.metrics = metrics or Metrics()
+        self.turns = turns or TurnRegistry(self.metrics)
+        self.answer_bundle = answer_bundle
         models = list(settings.openrouter_models or [])
         if settings.openrouter_model and settings.openrouter_model not in models:
             models.insert(0, settings.openrouter_model)
-        self.model_candidates = models or [settings.openrouter_model]
+        self.configured_models = models or [settings.openrouter_model]
+        self.degraded_model = settings.admission_degraded_model or next(
+            (model for model in self.configured_models if model.endswith(":free")), self.configured_models[-1]
+        )
+
+    def refresh_map(self) -> None:
+        """Pick up a reloaded map; long-lived callers (WebSocket sessions) do this per turn."""
+        self.map = self.map_loader.current
+
+    @property
+    def model_candidates(self) -> List[str]:
+        """Configured models reordered by breaker health; open breakers are skipped."""
+        return self._candidates(None)
 
-    async def start_session(self) -> Dict[str, str]:
+    def _candidates(self, preferred: Optional[str]) -> List[str]:
+        """`model_candidates` with `preferred` (a degraded turn's model) moved to the front."""
+        candidates = self.model_health.order(self.configured_models)
+        if preferred in candidates:
+            candidates.remove(preferred)
+            candidates.insert(0, preferred)
+        return candidates
+
+    def _degradation(self, degrade: Collection[str]) -> Tuple[Optional[str], bool]:
+        """Admission degradations for one turn: (model to try first, whether to synthesize audio)."""
+        preferred = self.degraded_model if "cheap_model" in degrade else None
+        return preferred, "no_audio" not in degrade
+
+    async def start_session(
+        self, audio_delivery: Optional[AudioDelivery] = None, audio_format: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Open a session and return the greeting with its (prewarmed) audio."""
         session_id = str(uuid.uuid4())
-        await self.session_store.create(session_id)
-        await self.session_store.append(session_id, "assistant", self.settings.default_greeting)
-        return {"session_id": session_id, "message": self.settings.default_greeting}
+        greeting = self.settings.default_greeting
+        timer = StageTimer()
+        speech_payload, _ = await asyncio.gather(
+            timer.timed(
+                "tts",
+                self._greeting_speech(greeting, audio_delivery or self.settings.audio_delivery, audio_format),
+            ),
+            timer.timed("session_write", self._open_session(session_id, greeting)),
+        )
+        return {
+            "session_id": session_id,
+            "message": greeting,
+            "speech": speech_payload,
+            "timings": timer.finish(),
+        }
 
-    async def generate_response(self, session_id: str, transcript: str) -> Dict[str, Any]:
-        await self.session_store.append(session_id, "user", transcript)
-        history = await self.session_store.get_history(session_id)
-        messages = [
-            {"role": "system", "content": MAP_CONTEXT},
-            {"role": "system", "content": SYSTEM_PROMPT},
-        ] + history
-        raw_json = await self._chat_with_models(messages)
-        try:
-            parsed = json.loads(raw_json)
-        except json.JSONDecodeError as exc:
-            raise HTTPException(status_code=502, detail="Model returned invalid JSON") from exc
-        normalized = self._normalize_llm_payload(parsed)
+    async def generate_response(
+        self,
+        session_id: str,
+        transcript: str,
+        audio_delivery: Optional[AudioDelivery] = None,
+        degrade: Collection[str] = (),
+        audio_format: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Answer one turn. A newer transcript for the same session cancels it (TurnCancelled).
+
+        The result carries this turn's per-stage seconds under `timings`.
+
+        `degrade` comes from the admission scheduler; degraded answers skip the response cache.
+        `audio_format` is the negotiated clip format (None: the TTS backend's own).
+        """
+        return await self.turns.run(
+            session_id, self._respond(session_id, transcript, audio_delivery, degrade, audio_format)
+        )
+
+    async def _respond(
+        self,
+        session_id: str,
+        transcript: str,
+        audio_delivery: Optional[AudioDelivery],
+        degrade: Collection[str],
+        audio_format: Optional[str],
+    ) -> Dict[str, Any]:
+        delivery = audio_delivery or self.settings.audio_delivery
+        preferred, with_audio = self._degradation(degrade)
+        timer = StageTimer()
+        with timer.stage("history"):
+            history = await self._prepare_history(session_id, transcript)
+        cache_key = self._response_cache_key(transcript, history)
+        cached = self._answer_without_llm(transcript, history, cache_key)
+        parsed: Optional[Dict[str, Any]] = None
+        if cached is not None:
+            normalized, speech_payload = cached
+            narration = normalized["narration"]
+            if delivery != "inline" or audio_format is not None:
+                # Re-issue through SpeechService so the clip is servable by URL (a TTS cache hit)
+                # or converted; the response cache only holds the backend's own format.
+                speech_payload = None
+        else:
+            with timer.stage("llm"):
+                parsed = await self._coalesced_chat(
+                    cache_key, self._llm_messages(transcript, history), preferred
+                )
+            narration = self._narration(parsed)
+            speech_payload = None
 
-        await self.session_store.append(session_id, "assistant", normalized["narration"])
-        speech_payload = await self.speech_service.synthesize(normalized["narration"])
+        # TTS starts as soon as the narration is known; the session write and
+        # normalization run while it is in flight.
+        speech_task = None
+        if speech_payload is None and with_audio:
+            speech_task = asyncio.create_task(
+                timer.timed("tts", self.speech_service.synthesize(narration, delivery, audio_format))
+            )
+        write_task = asyncio.create_task(
+            timer.timed("session_write", self._record_turn(session_id, transcript, narration))
+        )
+        tasks = [task for task in (speech_task, write_task) if task is not None]
+        try:
+            if parsed is not None:
+                with timer.stage("normalize"):
+                    normalized = self._normalize_llm_payload(parsed)
+            await asyncio.gather(*tasks)
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError) and not released():
+                for task in tasks:
+                    task.cancel()
+            else:
+                release(tasks)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        if speech_task is not None:
+            speech_payload = speech_task.result()
+            if not degrade and audio_format is None:
+                self._store_response(cache_key, normalized, speech_payload)
+        timings = timer.finish(self.stage_latency)
+        self.metrics.observe_stages(timings)
 
         normalized.update(
             {
                 "session_id": session_id,
                 "transcript": transcript,
                 "speech": speech_payload,
+                "timings": timings,
             }
         )
 
         return normalized
 
-    async def _chat_with_models(self, messages: List[Dict[str, str]]) -> str:
-        errors: List[str] = []
-        for model in self.model_candidates:
+    async def stream_response(
+        self,
+        session_id: str,
+        transcript: str,
+        degrade: Collection[str] = (),
+        audio_format: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield `payload`, `audio` and `done` events as soon as each is ready.
+
+        Narration sentences are handed to TTS while the completion is still streaming,
+        so audio chunks may be emitted before the navigation payload. Audio events
+        carry raw bytes under `audio`; transports encode them as they need.
+        """
+        preferred, with_audio = self._degradation(degrade)
+        history = await self._prepare_history(session_id, transcript)
+        cache_key = self._response_cache_key(transcript, history)
+        cached = self._answer_without_llm(transcript, history, cache_key)
+        if cached is not None:
+            normalized, speech_payload = cached
+            if audio_format is not None:
+                speech_payload = None
+            append = self._record_turn(session_id, transcript, normalized["narration"])
+            if speech_payload is None and with_audio:
+                speech_payload, _ = await asyncio.gather(
+                    self.speech_service.synthesize(normalized["narration"], audio_format=audio_format), append
+                )
+                if audio_format is None:
+                    self._store_response(cache_key, normalized, speech_payload)
+            else:
+                await append
+            normalized.update({"session_id": session_id, "transcript": transcript})
+            yield "payload", normalized
+            if speech_payload is not None:
+                yield "audio", {
+                    "mime_type": speech_payload["mime_type"],
+                    "audio": base64.b64decode(speech_payload["base64"]),
+                }
+            yield "done", {"session_id": session_id}
+            return
+
+        messages = self._llm_messages(transcript, history)
+        events: asyncio.Queue[Tuple[str, Dict[str, Any]]] = asyncio.Queue()
+        sentences: asyncio.Queue[Optional[str]] = asyncio.Queue()
+
+        async def produce() -> None:
+            voice_field = StreamingField("voice_response")
+            spoken = 0
+            model: Optional[str] = None
+            async for model, delta in self._stream_with_models(messages, preferred):
+                voice = voice_field.feed(delta)
+                if voice:
+                    boundary = last_sentence_boundary(voice, spoken)
+                    if boundary > spoken:
+                        await sentences.put(voice[spoken:boundary].strip())
+                        spoken = boundary
+
+            normalized = self._normalize_llm_payload(
+                self._parse_model_output(voice_field.buffer, model)
+            )
+            narration = normalized["narration"]
+            streamed = voice_field.value
+            remainder = streamed[spoken:] if streamed and streamed.strip() == narration else narration
+            if not spoken or remainder.strip():
+                await sentences.put(remainder.strip())
+            await sentences.put(None)
+
+            await self._record_turn(session_id, transcript, narration)
+            if not degrade:
+                self._store_response(cache_key, normalized)
+            normalized.update({"session_id": session_id, "transcript": transcript})
+            await events.put(("payload", normalized))
+
+        async def speak() -> None:
+            while (text := await sentences.get()) is not None:
+                if not text or not with_audio:
+                    continue
+                async for chunk in self.speech_service.stream(text, audio_format):
+                    await events.put(("audio", {"mime_type": audio_mime_type(chunk), "audio": chunk}))
+
+        async def run(stage) -> None:
             try:
-                return await self._chat_with_retry(messages, model=model)
+                await stage()
             except HTTPException as exc:
-                if exc.status_code == 401:
-                    raise
-                errors.append(f"{model}: {exc.detail}")
+                await events.put(("error", {"status_code": exc.status_code, "detail": exc.detail}))
+            except Exception as exc:  # pragma: no cover
+                await events.put(("error", {"status_code": 502, "detail": str(exc)}))
+            else:
+                await events.put(("stage_done", {}))
+
+        tasks = [asyncio.create_task(run(produce)), asyncio.create_task(run(speak))]
+        failed = False
+        try:
+            pending = len(tasks)
+            while pending:
+                event, data = await events.get()
+                if event == "stage_done":
+                    pending -= 1
+                    continue
+                yield event, data
+                if event == "error":
+                    failed = True
+                    return
+            yield "done", {"session_id": session_id}
+        finally:
+            # After an error the other stage is no longer needed; otherwise the turn itself
+            # was cancelled or abandoned by its client.
+            if failed or released():
+                release(tasks)
+            else:
+                for task in tasks:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _open_session(self, session_id: str, greeting: str) -> None:
+        await self.session_store.create(session_id)
+        await self.session_store.append(session_id, "assistant", greeting)
+
+    async def _greeting_speech(
+        self, greeting: str, delivery: AudioDelivery, audio_format: Optional[str]
+    ) -> Optional[Dict[str, str]]:
+        if not self.settings.wake_greeting_audio:
+            return None
+        try:
+            return await self.speech_service.synthesize(greeting, delivery, audio_format)
+        except HTTPException as exc:
+            # The session is still usable without audio; the client can fall back to local TTS.
+            logger.warning("Greeting TTS failed: %s", exc.detail)
+            return None
+
+    async def _prepare_history(self, session_id: str, transcript: str) -> List[Dict[str, str]]:
+        # The question is only stored together with its answer (see `_record_turn`).
+        history = await self.session_store.get_history(session_id)
+        return history + [{"role": "user", "content": transcript}]
+
+    async def _record_turn(self, session_id: str, transcript: str, narration: str) -> None:
+        """Store question and answer as a pair.
+
+        A turn cancelled before this point leaves the history untouched; once started,
+        the write is shielded so a cancellation cannot store the question alone.
+        """
+
+        async def write() -> None:
+            await self.session_store.append(session_id, "user", transcript)
+            await self.session_store.append(session_id, "assistant", narration)
+
+        await asyncio.shield(write())
+
+    def _llm_messages(self, transcript: str, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        return self.map.prompt_prefix.messages_for(transcript, history) + history
+
+    def _response_cache_key(
+        self, transcript: str, history: List[Dict[str, str]]
+    ) -> Optional[str]:
+        """Only context-free turns (nothing asked before this one) are cacheable."""
+        if self.response_cache is None or not self._context_free(history):
+            return None
+        return normalize_transcript(transcript, self.map.campus_map) or None
+
+    @staticmethod
+    def _context_free(history: List[Dict[str, str]]) -> bool:
+        # Only the greeting and this turn may be present.
+        return sum(1 for message in history if message["role"] != "assistant") <= 1
+
+    def _answer_without_llm(
+        self, transcript: str, history: List[Dict[str, str]], cache_key: Optional[str]
+    ) -> Optional[Tuple[Dict[str, Any], Optional[Dict[str, str]]]]:
+        """Local map answer, precomputed bundle answer or cached payload; None means the LLM has to be asked."""
+        if self.settings.local_navigation_enabled:
+            local = self.map.navigator.answer(transcript)
+            if local is not None:
+                return local, None
+        if self.answer_bundle is not None and self._context_free(history):
+            # Precomputed offline, so it also answers while OpenRouter is unreachable.
+            bundled = self.answer_bundle.answer(
+                normalize_transcript(transcript, self.map.campus_map), self.map.content_hash
+            )
+            if bundled is not None:
+                return bundled, None
+        if cache_key is None:
+            return None
+        return self.response_cache.get(cache_key, self.map.content_hash)
+
+    def _store_response(
+        self,
+        cache_key: Optional[str],
+        normalized: Dict[str, Any],
+        speech_payload: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if cache_key is not None:
+            # Only the primary backend's inline audio is reused; a fallback clip would keep
+            # being served after the primary recovers.
+            if speech_payload is not None and (
+                "base64" not in speech_payload
+                or speech_payload.get("backend") != self.speech_service.primary_backend
+            ):
+                speech_payload = None
+            self.response_cache.put(cache_key, self.map.content_hash, normalized, speech_payload)
+
+    def _parse_model_output(self, raw_json: str, model: Optional[str]) -> Dict[str, Any]:
+        """Tolerant parse; outcomes are counted against `model` so bad JSON demotes it."""
+        breaker = self.model_health.breaker(model) if model else None
+        try:
+            parsed, repaired = parse_llm_object(raw_json)
+        except ValueError as exc:
+            self.metrics.llm_invalid_json.inc(model or "unknown")
+            if breaker is not None:
+                breaker.record_invalid_output()
+            raise HTTPException(status_code=502, detail="Model returned invalid JSON") from exc
+        if repaired:
+            self.metrics.llm_repaired_json.inc(model or "unknown")
+            if breaker is not None:
+                breaker.repaired_outputs += 1
+        return parsed
+
+    async def _coalesced_chat(
+        self, cache_key: Optional[str], messages: List[Dict[str, str]], preferred: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Identical in-flight prompts (same normalized question, or same messages) share one call."""
+        if self.chat_flights is None:
+            return await self._chat_with_models(messages, preferred)
+        prompt = cache_key or hashlib.sha256(
+            json.dumps(messages, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return await self.chat_flights.do(
+            (self.map.content_hash, prompt, preferred), lambda: self._chat_with_models(messages, preferred)
+        )
+
+    async def _chat_with_models(
+        self, messages: List[Dict[str, str]], preferred: Optional[str] = None
+    ) -> Dict[str, Any]:
+        async with self.llm_limits.total.slot():
+            if self.settings.openrouter_hedging != "off":
+                return await self._chat_hedged(messages, preferred)
+            failures: List[Tuple[str, HTTPException]] = []
+            for model in self._candidates(preferred):
+                if failures:
+                    self.metrics.llm_fallbacks.inc(failures[-1][0], "error")
+                try:
+                    return await self._timed_chat(messages, model)
+                except HTTPException as exc:
+                    if exc.status_code == 401:
+                        raise
+                    failures.append((model, exc))
+            raise self._all_models_failed(failures)
+
+    async def _chat_hedged(
+        self, messages: List[Dict[str, str]], preferred: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Overlap model candidates; the first one returning a JSON object wins.
+
+        In "hedge" mode the next candidate starts when the newest one outlives its latency
+        budget or fails; in "race" mode every candidate starts at once. Losers are released (see `release`),
+        so only a cancelled turn counts their calls as abandoned upstream work.
+        """
+        candidates = self._candidates(preferred)
+        running: Dict[asyncio.Task, str] = {}
+        failures: List[Tuple[str, HTTPException]] = []
+        launched = 0
+
+        def launch_next(reason: str = "") -> None:
+            nonlocal launched
+            if reason:
+                self.metrics.llm_fallbacks.inc(candidates[launched - 1], reason)
+            model = candidates[launched]
+            launched += 1
+            running[asyncio.create_task(self._timed_chat(messages, model))] = model
+
+        launch_next()
+        if self.settings.openrouter_hedging == "race":
+            while launched < len(candidates):
+                launch_next("race")
+
+        finished = False
+        try:
+            while running:
+                budget = (
+                    self._hedge_budget(candidates[launched - 1]) if launched < len(candidates) else None
+                )
+                done, _ = await asyncio.wait(
+                    running, timeout=budget, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch_next("hedge")
+                    continue
+                for task in done:
+                    model = running.pop(task)
+                    try:
+                        result = task.result()
+                    except HTTPException as exc:
+                        if exc.status_code == 401:
+                            finished = True
+                            raise
+                        failures.append((model, exc))
+                    else:
+                        finished = True
+                        return result
+                # Everything that finished failed; replace it with the next candidate.
+                if launched < len(candidates):
+                    launch_next("error")
+        finally:
+            if finished or released():
+                release(running)
+            else:
+                for task in running:
+                    task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        raise self._all_models_failed(failures)
+
+    def _hedge_budget(self, model: str) -> float:
+        """How long to wait on `model` before hedging, adapted to its observed latency."""
+        settings = self.settings
+        if self.latency_tracker.count(model) < settings.openrouter_hedge_min_samples:
+            return settings.openrouter_hedge_delay_seconds
+        observed = self.latency_tracker.percentile(model, settings.openrouter_hedge_percentile)
+        return min(
+            settings.openrouter_hedge_max_delay_seconds,
+            max(settings.openrouter_hedge_min_delay_seconds, observed),
+        )
+
+    async def _timed_chat(self, messages: List[Dict[str, str]], model: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        parsed = await self._chat_with_retry(messages, model=model)
+        self.latency_tracker.record(model, time.perf_counter() - started)
+        return parsed
+
+    @staticmethod
+    def _all_models_failed(failures: List[Tuple[str, HTTPException]]) -> HTTPException:
+        # Every model was merely busy: answer 503 + Retry-After rather than a hard 502.
+        if failures and all(isinstance(exc, Overloaded) for _, exc in failures):
+            return failures[-1][1]
         detail = "All OpenRouter models failed. "
-        if errors:
-            detail += " | ".join(errors)
-        raise HTTPException(status_code=502, detail=detail)
+        if failures:
+            detail += " | ".join(f"{model}: {exc.detail}" for model, exc in failures)
+        return HTTPException(status_code=502, detail=detail)
 
     async def _chat_with_retry(
         self,
@@ -144,11 +587,116 @@ class ConversationService:
         *,
         model: str,
         retries: int = 3,
-    ) -> str:
+    ) -> Dict[str, Any]:
+        breaker = self.model_health.breaker(model)
+        delay = 1.0
+        for attempt in range(retries):
+            if not breaker.allow_request():
+                # Another request is already probing this half-open model.
+                raise Overloaded(model, self.llm_limits.retry_after_seconds)
+            try:
+                async with self.llm_limits.model(model).slot():
+                    started_at = time.perf_counter()
+                    raw_json = await self.openrouter.chat(messages, model=model)
+                elapsed = time.perf_counter() - started_at
+                # Unusable output is a failure of this model; the caller moves on to the next one.
+                parsed = self._parse_model_output(raw_json, model)
+                breaker.record_success(elapsed)
+                self.metrics.llm_seconds.observe(elapsed, model, "ok")
+                return parsed
+            except asyncio.CancelledError:
+                if not released():
+                    self.metrics.upstream_cancelled.inc("llm")
+                raise
+            except httpx.HTTPStatusError as exc:
+                status_code = exc.response.status_code
+                if status_code == 401:
+                    detail = (
+                        "OpenRouter rejected the API key (401). "
+                        "Verify OPENROUTER_API_KEY and that the model is accessible."
+                    )
+                    raise HTTPException(status_code=401, detail=detail) from exc
+                breaker.record_failure(f"HTTP {status_code}")
+                self._record_upstream_failure(model, started_at, str(status_code))
+                # Stop backing off once the breaker has given up on this model.
+                if status_code == 429 and attempt < retries - 1 and breaker.available():
+                    self.metrics.llm_retry_sleep_seconds.observe(delay, model)
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                    continue
+                detail = (
+                    "OpenRouter rate limit reached. Please retry in a moment."
+                    if status_code == 429
+                    else "OpenRouter rejected the request"
+                )
+                raise HTTPException(status_code=status_code or 502, detail=detail) from exc
+            except httpx.RequestError as exc:
+                breaker.record_failure(type(exc).__name__)
+                self._record_upstream_failure(model, started_at, "error")
+                if attempt < retries - 1 and breaker.available():
+                    self.metrics.llm_retry_sleep_seconds.observe(delay, model)
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                    continue
+                raise HTTPException(status_code=502, detail="Could not reach OpenRouter") from exc
+
+        raise HTTPException(status_code=502, detail="OpenRouter is unavailable right now")
+
+    def _record_upstream_failure(self, model: str, started_at: float, outcome: str) -> None:
+        self.metrics.llm_seconds.observe(time.perf_counter() - started_at, model, outcome)
+        if outcome == "429":
+            self.metrics.llm_rate_limited.inc(model)
+
+    async def _stream_with_models(
+        self, messages: List[Dict[str, str]], preferred: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """Yield (model, delta) pairs from the first model that starts streaming."""
+        async with self.llm_limits.total.slot():
+            failures: List[Tuple[str, HTTPException]] = []
+            for model in self._candidates(preferred):
+                if failures:
+                    self.metrics.llm_fallbacks.inc(failures[-1][0], "error")
+                started = False
+                try:
+                    async for delta in self._stream_with_retry(messages, model=model):
+                        started = True
+                        yield model, delta
+                    return
+                except HTTPException as exc:
+                    # Once deltas have been forwarded a different model cannot take over.
+                    if exc.status_code == 401 or started:
+                        raise
+                    failures.append((model, exc))
+            raise self._all_models_failed(failures)
+
+    async def _stream_with_retry(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: str,
+        retries: int = 3,
+    ) -> AsyncIterator[str]:
+        breaker = self.model_health.breaker(model)
         delay = 1.0
         for attempt in range(retries):
+            if not breaker.allow_request():
+                # Another request is already probing this half-open model.
+                raise Overloaded(model, self.llm_limits.retry_after_seconds)
+            started = False
             try:
-                return await self.openrouter.chat(messages, model=model)
+                async with self.llm_limits.model(model).slot():
+                    started_at = time.perf_counter()
+                    async for delta in self.openrouter.chat_stream(messages, model=model):
+                        started = True
+                        yield delta
+                elapsed = time.perf_counter() - started_at
+                breaker.record_success(elapsed)
+                self.metrics.llm_seconds.observe(elapsed, model, "ok")
+                return
+            except asyncio.CancelledError:
+                if not released():
+                    self.metrics.upstream_cancelled.inc("llm")
+                raise
             except httpx.HTTPStatusError as exc:
                 status_code = exc.response.status_code
                 if status_code == 401:
@@ -157,7 +705,10 @@ class ConversationService:
                         "Verify OPENROUTER_API_KEY and that the model is accessible."
                     )
                     raise HTTPException(status_code=401, detail=detail) from exc
-                if status_code == 429 and attempt < retries - 1:
+                breaker.record_failure(f"HTTP {status_code}")
+                self._record_upstream_failure(model, started_at, str(status_code))
+                if status_code == 429 and attempt < retries - 1 and breaker.available():
+                    self.metrics.llm_retry_sleep_seconds.observe(delay, model)
                     await asyncio.sleep(delay)
                     delay *= 2
                     continue
@@ -168,17 +719,26 @@ class ConversationService:
                 )
                 raise HTTPException(status_code=status_code or 502, detail=detail) from exc
             except httpx.RequestError as exc:
-                if attempt < retries - 1:
+                breaker.record_failure(type(exc).__name__)
+                self._record_upstream_failure(model, started_at, "error")
+                if not started and attempt < retries - 1 and breaker.available():
+                    self.metrics.llm_retry_sleep_seconds.observe(delay, model)
                     await asyncio.sleep(delay)
                     delay *= 2
                     continue
                 raise HTTPException(status_code=502, detail="Could not reach OpenRouter") from exc
+            except RuntimeError as exc:
+                breaker.record_failure(str(exc))
+                raise HTTPException(status_code=502, detail=str(exc)) from exc
 
         raise HTTPException(status_code=502, detail="OpenRouter is unavailable right now")
 
+    def _narration(self, parsed: Dict[str, Any]) -> str:
+        return str(parsed.get("voice_response") or self.settings.default_greeting).strip()
+
     def _normalize_llm_payload(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
         thought = str(parsed.get("thought", "")).strip()
-        voice = str(parsed.get("voice_response") or self.settings.default_greeting).strip()
+        voice = self._narration(parsed)
 
         nav = parsed.get("navigation_display") or {}
         target_building = str(nav.get("target_building") or parsed.get("destination") or "General").strip()
@@ -219,11 +779,7 @@ class ConversationService:
         zone_statement = f"Aim for the {zone_color} Zone relative to the Central Library."
         steps.append(zone_statement)
 
-        segments = [
-            segment.strip(",. ")
-            for segment in re.split(r"(?<=[.!?])\s+", guide)
-            if segment.strip()
-        ]
+        segments = [segment.strip(",. ") for segment in split_sentences(guide)]
         for segment in segments:
             if len(steps) >= 4:
                 break
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.services.admission import AdmissionScheduler, admit_client
+from app.services.conversation import ConversationService
+from app.services.turns import TurnCancelled
+
+
+class SlowConsumer(Exception):
+    """The client stopped reading: a frame could not be sent within the send timeout."""
+
+
+class ConversationSocket:
+    """One kiosk's conversation over a single long-lived WebSocket.
+
+    Text frames are JSON. The client sends `{"type": "transcript", "transcript": ...}`
+    (or `{"type": "ping"}`); the server sends `session`, `payload`, `done`, `error`
+    and `pong` messages. Audio goes out as an `audio` message announcing the MIME type
+    and size, immediately followed by one binary frame with the raw bytes.
+
+    One turn runs at a time: a new transcript supersedes the one being answered,
+    which is cancelled (with its upstream calls) and reported as `cancelled`. A
+    client that stops reading is disconnected after `send_timeout_seconds`.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        service: ConversationService,
+        *,
+        scheduler: Optional[AdmissionScheduler] = None,
+        send_timeout_seconds: float = 10.0,
+        audio_format: Optional[str] = None,
+    ) -> None:
+        self.websocket = websocket
+        self.service = service
+        self.scheduler = scheduler
+        self.send_timeout_seconds = send_timeout_seconds
+        self.audio_format = audio_format
+        self.session_id: Optional[str] = None
+        self._turn = 0
+        self._current: Optional[asyncio.Task] = None
+        # Set when a turn fails on the transport (e.g. SlowConsumer) to end the connection.
+        self._failed: Optional[asyncio.Future] = None
+        # Keeps an audio announcement and its binary frame adjacent on the wire.
+        self._send_lock = asyncio.Lock()
+
+    async def run(self, session_id: Optional[str] = None) -> None:
+        """Greet (or resume `session_id`), then serve turns until either side goes away."""
+        await self._open(session_id)
+        self._failed = asyncio.get_running_loop().create_future()
+        reader = asyncio.create_task(self._read())
+        try:
+            done, _ = await asyncio.wait([reader, self._failed], return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        finally:
+            self._failed.cancel()
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+            current = self._current
+            if current is not None:
+                # The client is gone: stop paying for an answer nobody will hear.
+                self.service.turns.cancel(current, "disconnected")
+                await asyncio.gather(current, return_exceptions=True)
+
+    async def _open(self, session_id: Optional[str]) -> None:
+        if session_id:
+            self.session_id = session_id
+            await self._send({"type": "session", "session_id": session_id, "resumed": True})
+            return
+        greeting = await self.service.start_session("url", self.audio_format)
+        self.session_id = greeting["session_id"]
+        await self._send(
+            {"type": "session", "session_id": self.session_id, "message": greeting["message"], "resumed": False}
+        )
+        speech = greeting.get("speech")
+        audio = self.service.speech_service.clip(speech["audio_id"]) if speech else None
+        if audio:
+            await self._send_audio(0, speech["mime_type"], audio)
+
+    async def _read(self) -> None:
+        while True:
+            frame = await self.websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            try:
+                message = json.loads(frame.get("text") or "")
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                await self._error(None, 400, "Frames must be JSON objects.")
+                continue
+            kind = message.get("type", "transcript")
+            if kind == "ping":
+                await self._send({"type": "pong"})
+                continue
+            transcript = str(message.get("transcript") or "").strip() if kind == "transcript" else ""
+            if not transcript:
+                await self._error(None, 422, "Expected a non-empty transcript.")
+                continue
+            self._turn += 1
+            self._current = asyncio.create_task(self._answer(self._turn, transcript))
+            self._current.add_done_callback(self._turn_finished)
+
+    def _turn_finished(self, task: asyncio.Task) -> None:
+        if self._current is task:
+            self._current = None
+        if task.cancelled() or task.exception() is None:
+            return
+        if self._failed is not None and not self._failed.done():
+            self._failed.set_exception(task.exception())
+
+    async def _answer(self, turn: int, transcript: str) -> None:
+        self.service.refresh_map()
+        try:
+            async with admit_client(self.scheduler, self.websocket.headers) as degrade:
+                await self.service.turns.run(self.session_id, self._stream(turn, transcript, degrade))
+        except TurnCancelled as exc:
+            await self._send({"type": "cancelled", "turn": turn, "reason": exc.reason})
+        except HTTPException as exc:
+            # Refused by the admission scheduler (rate limit or full queue).
+            await self._error(turn, exc.status_code, exc.detail)
+
+    async def _stream(self, turn: int, transcript: str, degrade: Tuple[str, ...]) -> None:
+        async for event, data in self.service.stream_response(
+            self.session_id, transcript, degrade, self.audio_format
+        ):
+            if event == "audio":
+                await self._send_audio(turn, data["mime_type"], data["audio"])
+            else:
+                await self._send({"type": event, "turn": turn, **data})
+
+    async def _error(self, turn: Optional[int], status_code: int, detail: str) -> None:
+        await self._send({"type": "error", "turn": turn, "status_code": status_code, "detail": detail})
+
+    async def _send_audio(self, turn: int, mime_type: str, audio: bytes) -> None:
+        header = {"type": "audio", "turn": turn, "mime_type": mime_type, "size": len(audio)}
+
+        async def send_pair() -> None:
+            async with self._send_lock:
+                await self._timed_send(self.websocket.send_text(json.dumps(header)))
+                await self._timed_send(self.websocket.send_bytes(audio))
+
+        # A superseded turn must not leave an announcement without its binary frame.
+        await asyncio.shield(send_pair())
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        async with self._send_lock:
+            await self._timed_send(self.websocket.send_text(json.dumps(message, ensure_ascii=False)))
+
+    async def _timed_send(self, send: Any) -> None:
+        try:
+            await asyncio.wait_for(send, self.send_timeout_seconds)
+        except asyncio.TimeoutError:
+            raise SlowConsumer() from None
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_FENCE = re.compile(r"```[A-Za-z0-9_-]*[ \t]*\n?(.*?)(?:```|$)", re.DOTALL)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def strip_code_fences(text: str) -> str:
+    """Contents of the first ``` fenced block (closed or not), or `text` unchanged."""
+    match = _FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def extract_json_object(text: str) -> Optional[str]:
+    """The first balanced `{...}` in `text`; an unterminated object runs to the end."""
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = escape = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : index + 1]
+    return text[start:]
+
+
+def repair_candidates(fragment: str) -> Iterator[str]:
+    """Progressively repaired versions of a JSON object fragment.
+
+    Fixes trailing commas, comments, Python literals, raw newlines in strings and
+    stray closers, then closes whatever a truncated completion left open. If that
+    still fails, the last incomplete member is dropped.
+    """
+    out: List[str] = []
+    closers: List[str] = []
+    # Output length and open closers at each comma, to cut back to the last full member.
+    commas: List[Tuple[int, Tuple[str, ...]]] = []
+    in_string = escape = False
+    index, length = 0, len(fragment)
+    while index < length:
+        char = fragment[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                char = "\\n"
+            out.append(char)
+            index += 1
+            continue
+        if fragment.startswith("//", index):
+            newline = fragment.find("\n", index)
+            index = length if newline < 0 else newline
+            continue
+        if fragment.startswith("/*", index):
+            end = fragment.find("*/", index + 2)
+            index = length if end < 0 else end + 2
+            continue
+        if char.isalpha():
+            end = index
+            while end < length and (fragment[end].isalnum() or fragment[end] == "_"):
+                end += 1
+            word = fragment[index:end]
+            out.append(_LITERALS.get(word, word))
+            index = end
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if not closers:
+                index += 1
+                continue
+            char = closers.pop()
+        elif char == ",":
+            commas.append((len(out), tuple(closers)))
+        out.append(char)
+        index += 1
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    yield _close(out, closers)
+    if commas:
+        cut, open_closers = commas[-1]
+        yield _close(out[:cut], list(open_closers))
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    position = len(out) - 1
+    while position >= 0 and out[position].isspace():
+        position -= 1
+    if position >= 0 and out[position] == ",":
+        del out[position]
+
+
+def _close(out: List[str], closers: List[str]) -> str:
+    text = "".join(out).rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(closers))
+
+
+def parse_llm_object(raw: str) -> Tuple[Dict[str, Any], bool]:
+    """Parse a model completion into a JSON object; returns (object, repaired).
+
+    Well-formed output takes the plain `json.loads` path. Otherwise code fences and
+    surrounding prose are stripped and the first object is repaired. Raises
+    ValueError when no object can be recovered.
+    """
+    try:
+        value = json.loads(raw)
+        if isinstance(value, dict):
+            return value, False
+    except (TypeError, ValueError):
+        pass
+    fragment = extract_json_object(strip_code_fences(raw or ""))
+    if fragment is None:
+        raise ValueError("no JSON object in model output")
+    for candidate in (fragment, *repair_candidates(fragment)):
+        try:
+            value = json.loads(candidate, strict=False)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value, True
+    raise ValueError("model output could not be repaired into a JSON object")
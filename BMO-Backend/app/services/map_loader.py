@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.campus_map import CampusMap, content_hash, parse_campus_map
+from app.services.navigation import LocalNavigator
+from app.services.prompt_prefix import MapMode, PromptPrefix
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_DIR = Path(__file__).resolve().parents[1] / "resources"
+MAP_FILE = RESOURCE_DIR / "aiu_map.md"
+MAP_FALLBACK = (
+    "### AIU Campus Map\n"
+    "(Update `app/resources/aiu_map.md` to embed the latest aerial map or schematic. "
+    "This block is streamed into the model before every response.)\n\n"
+    "Central anchor: Building 3 (Library).\n"
+    "Yellow Zone (West): Engineering + CS (Bldg 10), Engineering Labs (Bldg 9 & 11), Business & Legal (Bldg 8).\n"
+    "Red Zone (North): Administration spine (Bldg 1), Arts & Design (Bldg 7), Medical Cluster (Bldg 4,5,6).\n"
+    "Blue Zone (East): Hospital (Bldg 15), Housing (Bldg 13 & 14), Sports Hall (Bldg 17).\n"
+)
+
+
+@dataclass(frozen=True)
+class MapSnapshot:
+    """One version of the campus map with everything derived from it precomputed."""
+
+    campus_map: CampusMap
+    prompt_prefix: PromptPrefix
+    navigator: LocalNavigator
+    version: int
+    loaded_at: float
+
+    @property
+    def content_hash(self) -> str:
+        return self.campus_map.content_hash
+
+
+class MapLoader:
+    """Keeps the current `MapSnapshot` and swaps in a new one when the map file changes.
+
+    Requests only read `current`; parsing and prompt building happen off the event
+    loop and the new snapshot replaces the old one in a single assignment. The file is
+    watched with inotify (via `watchfiles`) when available, otherwise by polling mtime.
+    """
+
+    def __init__(
+        self,
+        path: Path = MAP_FILE,
+        *,
+        system_prompt: str,
+        fallback_text: str = MAP_FALLBACK,
+        map_mode: MapMode = "full",
+        context_turns: int = 2,
+        poll_interval_seconds: float = 2.0,
+    ) -> None:
+        self.path = path
+        self.system_prompt = system_prompt
+        self.fallback_text = fallback_text
+        self.map_mode = map_mode
+        self.context_turns = context_turns
+        self.poll_interval_seconds = poll_interval_seconds
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.watch_mode: Optional[str] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self.current = self._build(self._read(), version=1)
+
+    async def reload(self) -> bool:
+        """Re-read the map; returns True if a new version was swapped in."""
+        text = await asyncio.to_thread(self._read)
+        if content_hash(text) == self.current.content_hash:
+            return False
+        snapshot = await asyncio.to_thread(self._build, text, self.current.version + 1)
+        self.current = snapshot
+        self.reloads += 1
+        logger.info("Campus map reloaded (version %d, %s)", snapshot.version, snapshot.content_hash[:12])
+        return True
+
+    def start_watching(self) -> None:
+        if self._watcher is None or self._watcher.done():
+            self._stop = asyncio.Event()
+            self._watcher = asyncio.create_task(self._watch_forever(self._stop))
+
+    async def stop_watching(self) -> None:
+        if self._watcher is not None:
+            # The inotify watcher runs in a worker thread; ask it to exit instead of
+            # cancelling the task and leaving the thread behind at shutdown.
+            self._stop.set()
+            try:
+                await asyncio.wait_for(self._watcher, timeout=2.0)
+            except asyncio.TimeoutError:
+                pass
+            self._watcher = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        current = self.current
+        return {
+            "path": str(self.path),
+            "version": current.version,
+            "content_hash": current.content_hash,
+            "loaded_at": current.loaded_at,
+            "buildings": len(current.campus_map.buildings),
+            "aliases": len(current.campus_map.aliases),
+            "watch_mode": self.watch_mode,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+    async def _watch_forever(self, stop: asyncio.Event) -> None:
+        try:
+            from watchfiles import awatch
+        except ImportError:  # pragma: no cover - watchfiles ships with uvicorn[standard]
+            awatch = None
+
+        if awatch is None:
+            await self._poll_forever(stop)
+            return
+        self.watch_mode = "inotify"
+        # Watch the directory: editors often save by writing a temp file and renaming it.
+        async for changes in awatch(
+            self.path.parent, debounce=300, recursive=False, stop_event=stop
+        ):
+            if any(Path(changed).name == self.path.name for _, changed in changes):
+                await self._safe_reload()
+
+    async def _poll_forever(self, stop: asyncio.Event) -> None:
+        self.watch_mode = "poll"
+        stamp = self._stamp()
+        while not stop.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), timeout=self.poll_interval_seconds)
+            latest = self._stamp()
+            if latest != stamp:
+                stamp = latest
+                await self._safe_reload()
+
+    async def _safe_reload(self) -> None:
+        try:
+            await self.reload()
+        except Exception as exc:
+            # Keep serving the previous version rather than a half-read map.
+            self.failures += 1
+            self.last_error = str(exc)
+            logger.warning("Campus map reload failed: %s", exc)
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> str:
+        try:
+            return self.path.read_text(encoding="utf-8").strip() or self.fallback_text
+        except FileNotFoundError:
+            return self.fallback_text
+
+    def _build(self, text: str, version: int) -> MapSnapshot:
+        campus_map = parse_campus_map(text)
+        # Warm the lazily compiled indexes so the first request after a swap pays nothing.
+        campus_map.substitute_aliases("")
+        campus_map.excerpt((), ())
+        prefix = PromptPrefix(
+            campus_map,
+            self.system_prompt,
+            map_mode=self.map_mode,
+            context_turns=self.context_turns,
+        )
+        return MapSnapshot(
+            campus_map=campus_map,
+            prompt_prefix=prefix,
+            navigator=LocalNavigator(campus_map),
+            version=version,
+            loaded_at=time.time(),
+        )
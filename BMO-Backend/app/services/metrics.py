@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Seconds; spans a cached TTS clip (~1ms) to a slow model fallback chain (~30s).
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:  # pragma: no cover - overridden
+        return []
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., overflow count], sum.
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> List[str]:
+        lines: List[str] = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total[0])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """Process-wide counters, gauges and histograms rendered in Prometheus text format.
+
+    Recording is a dict lookup plus a bisect; no locks are needed on the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.llm_seconds = Histogram(
+            "bmo_llm_request_seconds", "OpenRouter call latency per model and outcome.", ("model", "outcome")
+        )
+        self.llm_retry_sleep_seconds = Histogram(
+            "bmo_llm_retry_sleep_seconds", "Backoff slept before retrying a model.", ("model",)
+        )
+        self.llm_rate_limited = Counter(
+            "bmo_llm_rate_limited_total", "HTTP 429 responses from OpenRouter.", ("model",)
+        )
+        self.llm_fallbacks = Counter(
+            "bmo_llm_fallbacks_total", "Times a model failed and the next candidate was tried.", ("model", "reason")
+        )
+        self.llm_invalid_json = Counter(
+            "bmo_llm_invalid_json_total", "Completions with no recoverable JSON object.", ("model",)
+        )
+        self.llm_repaired_json = Counter(
+            "bmo_llm_repaired_json_total", "Completions parsed only after fence stripping or repair.", ("model",)
+        )
+        self.stage_seconds = Histogram(
+            "bmo_stage_seconds", "Time per /respond pipeline stage.", ("stage",)
+        )
+        self.tts_seconds = Histogram(
+            "bmo_tts_synthesis_seconds", "TTS backend synthesis time (cache misses only).", ("backend",)
+        )
+        self.transcoded = Counter(
+            "bmo_tts_transcoded_total", "Clips converted to a client-negotiated audio format.", ("format",)
+        )
+        self.turns_cancelled = Counter(
+            "bmo_turns_cancelled_total", "Turns cancelled before answering (superseded or client gone).", ("reason",)
+        )
+        self.upstream_cancelled = Counter(
+            "bmo_upstream_cancelled_total", "OpenRouter and TTS calls abandoned by a cancelled turn.", ("kind",)
+        )
+        self.admissions = Counter(
+            "bmo_admissions_total",
+            "Admission decisions per client class (admitted, degraded, queued, rejected, rate_limited, timed_out).",
+            ("client_class", "outcome"),
+        )
+        self.admission_waiting = Gauge("bmo_admission_waiting", "Turns waiting for an admission slot.", ("client_class",))
+        self.active_sessions = Gauge("bmo_sessions_active", "Sessions held by the session store.")
+        self.session_messages = Gauge("bmo_session_store_messages", "Messages held by the session store.")
+        self.session_pending = Gauge("bmo_session_store_pending_writes", "Appends not yet flushed to the backend.")
+        self.llm_in_flight = Gauge("bmo_llm_in_flight", "LLM requests holding a bulkhead slot.")
+        self.llm_queued = Gauge("bmo_llm_queued", "LLM requests waiting for a bulkhead slot.")
+        self.openrouter_in_flight = Gauge("bmo_openrouter_in_flight", "HTTP requests open to OpenRouter.")
+        self.ws_connections = Gauge("bmo_websocket_connections", "Open conversation WebSockets.")
+
+    def observe_stages(self, timings: Mapping[str, float]) -> None:
+        for stage, seconds in timings.items():
+            self.stage_seconds.observe(seconds, stage)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in vars(self).values():
+            if isinstance(metric, _Metric):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def server_timing(timings: Optional[Mapping[str, float]]) -> str:
+    """`Server-Timing` header value (durations in ms) for per-stage timings in seconds."""
+    if not timings:
+        return ""
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
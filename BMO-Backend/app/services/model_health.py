@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_RANK = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding window of upstream calls.
+
+    Slow successes count against the model like failures, so a model that keeps
+    answering after `slow_call_seconds` is demoted the same way as one returning 429s.
+    Half-open lets a single probe through (claimed with `allow_request`); a probe that
+    never reports back is given up after `slow_call_seconds`.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = 50,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        slow_call_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.invalid_outputs = 0
+        self.repaired_outputs = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_started_at = None
+        return self._state
+
+    def available(self) -> bool:
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._probing())
+
+    def allow_request(self) -> bool:
+        """Whether a call may start now; in half-open the caller becomes the probe."""
+        if self.state != HALF_OPEN:
+            return True
+        if self._probing():
+            return False
+        self._probe_started_at = self._clock()
+        return True
+
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def score(self) -> float:
+        """Failure rate once the window holds enough calls to be meaningful, else 0."""
+        if len(self._outcomes) < self.min_calls:
+            return 0.0
+        return self.failure_rate()
+
+    def record_success(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+        if seconds >= self.slow_call_seconds:
+            self.record_failure(f"slow call ({seconds:.1f}s)")
+            return
+        if self.state == HALF_OPEN:
+            # The probe got through; start over with a clean window.
+            self._outcomes.clear()
+            self._state = CLOSED
+            self._probe_started_at = None
+        self._record(True)
+
+    def record_failure(self, reason: str) -> None:
+        self.last_error = reason
+        if self.state == HALF_OPEN:
+            self._trip()
+            return
+        self._record(False)
+
+    def record_invalid_output(self) -> None:
+        """The call succeeded but its completion could not be parsed, even after repair."""
+        self.invalid_outputs += 1
+        self.record_failure("invalid JSON")
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        return {
+            "state": self.state,
+            "calls": len(self._outcomes),
+            "failure_rate": round(self.failure_rate(), 3),
+            "p50_seconds": latencies[len(latencies) // 2] if latencies else None,
+            "p95_seconds": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+            "last_error": self.last_error,
+            "invalid_outputs": self.invalid_outputs,
+            "repaired_outputs": self.repaired_outputs,
+        }
+
+    def _record(self, ok: bool) -> None:
+        self._outcomes.append(ok)
+        if (
+            self._state == CLOSED
+            and len(self._outcomes) >= self.min_calls
+            and self.failure_rate() >= self.failure_rate_threshold
+        ):
+            self._trip()
+
+    def _probing(self) -> bool:
+        started = self._probe_started_at
+        return started is not None and self._clock() - started < self.slow_call_seconds
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_started_at = None
+
+
+class ModelHealthRegistry:
+    """One breaker per OpenRouter model, used to order and filter fallback candidates."""
+
+    def __init__(self, breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker) -> None:
+        self._breaker_factory = breaker_factory
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = self._breaker_factory()
+        return self._breakers[model]
+
+    def order(self, models: Sequence[str]) -> List[str]:
+        """Healthy models first (by failure rate, then configured order); open breakers are skipped.
+
+        If every breaker is open the configured order is returned unchanged, so a request is
+        never rejected without at least one upstream attempt.
+        """
+        ranked = sorted(
+            enumerate(models),
+            key=lambda item: (
+                _STATE_RANK[self.breaker(item[1]).state],
+                round(self.breaker(item[1]).score(), 1),
+                item[0],
+            ),
+        )
+        available = [model for _, model in ranked if self.breaker(model).available()]
+        return available or list(models)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {model: breaker.snapshot() for model, breaker in self._breakers.items()}
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Awaitable, Deque, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies (seconds) per model."""
+
+    def __init__(self, window: int = 50) -> None:
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, model: str, seconds: float) -> None:
+        self._samples[model].append(seconds)
+
+    def count(self, model: str) -> int:
+        return len(self._samples.get(model, ()))
+
+    def percentile(self, model: str, percentile: float) -> Optional[float]:
+        samples = self._samples.get(model)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {
+            model: {
+                "samples": len(samples),
+                "p50": self.percentile(model, 50),
+                "p95": self.percentile(model, 95),
+            }
+            for model, samples in self._samples.items()
+        }
+
+
+class StageTimer:
+    """Wall-clock seconds spent in each stage of one request.
+
+    Stages may overlap; `finish` adds the request's `total` and `overlap_saved`, the
+    time saved compared with running the same stages back to back.
+    """
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        with self.stage(name):
+            return await awaitable
+
+    def finish(self, tracker: Optional[LatencyTracker] = None) -> Dict[str, float]:
+        total = time.perf_counter() - self._started
+        timings = dict(self.stages)
+        timings["overlap_saved"] = max(0.0, sum(self.stages.values()) - total)
+        timings["total"] = total
+        if tracker is not None:
+            for name, seconds in timings.items():
+                tracker.record(name, seconds)
+        return timings
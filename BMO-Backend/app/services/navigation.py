@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional
+
+from app.services.campus_map import CampusMap
+from app.services.response_cache import normalize_transcript
+
+WHERE_IS = re.compile(
+    r"^(?:where is|where are|where can i find|how do i get to|how can i get to|how do i go to|"
+    r"take me to|directions to|show me|find|go to|i need to go to|i want to go to|way to)\s+"
+    r"(?:building (?P<numbers>\d+(?: \d+)*)|(?P<zone>[a-z]+) zone)$"
+)
+
+
+class LocalNavigator:
+    """Answers plain "where is X" questions straight from the parsed campus map.
+
+    Returns None for anything it cannot answer unambiguously so the caller can fall
+    back to the LLM.
+    """
+
+    def __init__(self, campus_map: CampusMap) -> None:
+        self.campus_map = campus_map
+
+    def answer(self, transcript: str) -> Optional[Dict[str, Any]]:
+        match = WHERE_IS.match(normalize_transcript(transcript, self.campus_map))
+        if not match:
+            return None
+        if match.group("zone"):
+            return self._zone_answer(match.group("zone").title())
+        numbers = [int(number) for number in match.group("numbers").split()]
+        return self._building_answer(numbers)
+
+    def _building_answer(self, numbers: List[int]) -> Optional[Dict[str, Any]]:
+        buildings = [self.campus_map.buildings.get(number) for number in numbers]
+        if not buildings or any(building is None for building in buildings):
+            return None
+        zones = {building.zone for building in buildings}
+        directions = self.campus_map.route_to(numbers[0])
+        if len(zones) != 1 or None in zones or directions is None:
+            return None
+
+        zone = zones.pop()
+        names = {building.name for building in buildings if building.name}
+        label = " and ".join(f"Building {number}" for number in numbers)
+        destination = f"{label} ({names.pop()})" if len(names) == 1 else label
+        if numbers == [self.campus_map.anchor]:
+            narration = f"You're at {destination} right now. Everything on campus is measured from here."
+        else:
+            verb = "are" if len(numbers) > 1 else "is"
+            narration = (
+                f"{destination} {verb} in the {zone} Zone. "
+                f"{directions[1]} Then follow the signs."
+            )
+        return self._payload(destination, zone, directions, narration)
+
+    def _zone_answer(self, color: str) -> Optional[Dict[str, Any]]:
+        zone = self.campus_map.zones.get(color)
+        if zone is None or not zone.direction:
+            return None
+        numbers = sorted(zone.buildings)
+        members = ", ".join(str(number) for number in numbers)
+        directions = [
+            f"Start at the Central Library (Building {self.campus_map.anchor}).",
+            f"Walk {zone.direction} into the {zone.color} Zone.",
+            "Use on-site signage once you reach the zone perimeter.",
+        ]
+        narration = f"The {zone.color} Zone is {zone.direction} of the Central Library."
+        if members:
+            noun = "Buildings" if len(numbers) > 1 else "Building"
+            narration += f" It covers {noun} {members}."
+        return self._payload(f"{zone.color} Zone", zone.color, directions, narration)
+
+    @staticmethod
+    def _payload(destination: str, zone: str, directions: List[str], narration: str) -> Dict[str, Any]:
+        return {
+            "narration": narration,
+            "destination": destination,
+            "directions": directions,
+            "mode": "NAVIGATING",
+            "thought": "Answered from the local campus map.",
+            "emotion": "happy",
+            "navigation_display": {
+                "target_building": destination,
+                "zone_color": zone,
+                "direction_guide": " ".join(directions),
+            },
+        }
@@ -1,41 +1,203 @@
 from __future__ import annotations
 
+import importlib.util
 import json
-from typing import Any, Dict, List, Optional
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
 
 import httpx
 
 from app.core.config import Settings
+from app.services.prompt_prefix import supports_cache_control, with_cache_hint
 
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
-class OpenRouterClient:
-    BASE_URL = "https://openrouter.ai/api/v1"
 
+class PoolMetrics:
+    """Request concurrency, pool wait and connection setup times for one httpx client.
+
+    Wait and setup times come from httpcore's `trace` extension: the first trace event
+    of a request marks the moment it got a connection from the pool.
+    """
+
+    def __init__(self, window: int = 200) -> None:
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections_opened = 0
+        self.pool_timeouts = 0
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._connects: Deque[float] = deque(maxlen=window)
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[Dict[str, Any]]:
+        """Count one request in flight and yield the request `extensions` carrying its tracer."""
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            yield {"trace": self._tracer(time.perf_counter())}
+        except httpx.PoolTimeout:
+            self.pool_timeouts += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "connections_opened": self.connections_opened,
+            "pool_timeouts": self.pool_timeouts,
+            "pool_wait_ms": _summary_ms(self._waits),
+            "connect_ms": _summary_ms(self._connects),
+        }
+
+    def _tracer(self, started: float) -> Callable[[str, Dict[str, Any]], Awaitable[None]]:
+        acquired = False
+        connect_started = 0.0
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            nonlocal acquired, connect_started
+            now = time.perf_counter()
+            if not acquired:
+                acquired = True
+                self._waits.append(now - started)
+            if event == "connection.connect_tcp.started":
+                connect_started = now
+            elif event == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            elif event == "connection.start_tls.complete":
+                self._connects.append(now - connect_started)
+
+        return trace
+
+
+def _summary_ms(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"samples": 0, "mean": None, "max": None}
+    return {
+        "samples": len(samples),
+        "mean": round(1000 * sum(samples) / len(samples), 2),
+        "max": round(1000 * max(samples), 2),
+    }
+
+
+class OpenRouterClient:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
-        self._client = httpx.AsyncClient(timeout=60)
+        self.base_url = settings.openrouter_base_url.rstrip("/")
+        self.metrics = PoolMetrics()
+        self.http2 = settings.openrouter_http2 and HTTP2_AVAILABLE
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=settings.openrouter_max_connections,
+                max_keepalive_connections=settings.openrouter_max_keepalive_connections,
+                keepalive_expiry=settings.openrouter_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(
+                settings.openrouter_read_timeout_seconds,
+                connect=settings.openrouter_connect_timeout_seconds,
+                pool=settings.openrouter_pool_timeout_seconds,
+            ),
+        )
+
+    async def prewarm(self) -> None:
+        """Open (and keep alive) a connection so the first chat skips DNS, TCP and TLS setup."""
+        async with self.metrics.track() as extensions:
+            response = await self._client.head(f"{self.base_url}/models", extensions=extensions)
+        await response.aclose()
 
     async def chat(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
-        payload = {
-            "model": model or self.settings.openrouter_model,
+        async with self.metrics.track() as extensions:
+            response = await self._client.post(
+                f"{self.base_url}/chat/completions",
+                json=self._build_payload(messages, model),
+                headers=self._headers(),
+                extensions=extensions,
+            )
+        response.raise_for_status()
+        data = response.json()
+        try:
+            return data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError) as exc:
+            raise RuntimeError("Unexpected OpenRouter response structure") from exc
+
+    async def chat_stream(
+        self, messages: List[Dict[str, str]], model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Yield content deltas from an OpenRouter `stream: true` completion."""
+        payload = self._build_payload(messages, model)
+        payload["stream"] = True
+        async with self.metrics.track() as extensions, self._client.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            json=payload,
+            headers=self._headers(),
+            extensions=extensions,
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                # OpenRouter interleaves ": OPENROUTER PROCESSING" keep-alive comments.
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                if chunk.get("error"):
+                    raise RuntimeError(f"OpenRouter stream error: {chunk['error']}")
+                try:
+                    delta = chunk["choices"][0].get("delta") or {}
+                except (KeyError, IndexError) as exc:
+                    raise RuntimeError("Unexpected OpenRouter response structure") from exc
+                content = delta.get("content")
+                if content:
+                    yield content
+
+    def _build_payload(
+        self, messages: List[Dict[str, str]], model: Optional[str]
+    ) -> Dict[str, Any]:
+        model = model or self.settings.openrouter_model
+        if supports_cache_control(model, self.settings.openrouter_prompt_cache_models):
+            messages = with_cache_hint(messages)
+        return {
+            "model": model,
             "temperature": self.settings.openrouter_temperature,
             "messages": messages,
             "response_format": {"type": "json_object"},
         }
-        headers = {
+
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.settings.openrouter_api_key}",
             "HTTP-Referer": self.settings.app_url,
             "X-Title": self.settings.app_name,
         }
-        response = await self._client.post(
-            f"{self.BASE_URL}/chat/completions", json=payload, headers=headers
-        )
-        response.raise_for_status()
-        data = response.json()
-        try:
-            return data["choices"][0]["message"]["content"]
-        except (KeyError, IndexError) as exc:
-            raise RuntimeError("Unexpected OpenRouter response structure") from exc
+
+    def pool_snapshot(self) -> Dict[str, Any]:
+        """Metrics plus the live connection states of the underlying httpcore pool."""
+        pool = getattr(self._client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "http2": self.http2,
+            "max_connections": self.settings.openrouter_max_connections,
+            "connections": len(connections),
+            "connections_idle": sum(1 for connection in connections if connection.is_idle()),
+            "connections_in_use": sum(
+                1 for connection in connections if not connection.is_idle() and not connection.is_closed()
+            ),
+            **self.metrics.snapshot(),
+        }
 
     async def aclose(self) -> None:
         await self._client.aclose()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from app.services.campus_map import CampusMap, content_hash
+from app.services.response_cache import normalize_transcript
+from app.services.session_store import ChatMessage, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+MapMode = Literal["full", "slice"]
+
+_EDITOR_SECTION = re.compile(
+    r"^#+\s*Instructions for human editors.*?(?=^#+\s|\Z)", re.IGNORECASE | re.MULTILINE | re.DOTALL
+)
+_EDITOR_ONLY_LINE = re.compile(r"^\s*(?:>.*|-{3,}|\*{3,})\s*$")
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_BLANK_RUNS = re.compile(r"\n{3,}")
+_BUILDING_MENTION = re.compile(r"\bbuilding ((?:\d+ ?)+)")
+
+
+def compact_map_text(text: str) -> str:
+    """Drop editor-only content (instructions section, blockquotes, rules, comments) and blank runs."""
+    text = _HTML_COMMENT.sub("", _EDITOR_SECTION.sub("", text))
+    lines = [line.rstrip() for line in text.splitlines() if not _EDITOR_ONLY_LINE.match(line)]
+    return _BLANK_RUNS.sub("\n\n", "\n".join(lines)).strip()
+
+
+def supports_cache_control(model: str, prefixes: Sequence[str]) -> bool:
+    return any(model.startswith(prefix) for prefix in prefixes)
+
+
+def with_cache_hint(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Mark the first (static) system message as a prompt-cache breakpoint."""
+    if not messages or messages[0]["role"] != "system" or not isinstance(messages[0]["content"], str):
+        return messages
+    first = {
+        "role": "system",
+        "content": [
+            {"type": "text", "text": messages[0]["content"], "cache_control": {"type": "ephemeral"}}
+        ],
+    }
+    return [first] + messages[1:]
+
+
+class PromptPrefix:
+    """Static system prefix (campus map + persona), built once and content-hashed.
+
+    The first message is always identical across requests so provider-side prompt
+    caches can reuse it. In `slice` mode the persona is that first message and only the
+    map lines about buildings or zones mentioned in the recent turns follow it.
+    """
+
+    def __init__(
+        self,
+        campus_map: CampusMap,
+        system_prompt: str,
+        *,
+        map_mode: MapMode = "full",
+        context_turns: int = 2,
+    ) -> None:
+        self.campus_map = campus_map
+        self.map_mode = map_mode
+        self.context_turns = context_turns
+        self.map_text = compact_map_text(campus_map.text)
+        self._persona: ChatMessage = {"role": "system", "content": system_prompt}
+        self._full: ChatMessage = {"role": "system", "content": f"{self.map_text}\n\n{system_prompt}"}
+        self.content_hash = content_hash(self._full["content"])
+        # What the prompt cost before compaction: raw map and persona as two messages.
+        self.uncompacted_tokens = estimate_tokens(campus_map.text) + estimate_tokens(system_prompt)
+        self.full_tokens = estimate_tokens(self._full["content"])
+        self.requests = 0
+        self.sliced = 0
+        self.tokens_sent = 0
+        self.last_tokens: Optional[int] = None
+
+    def messages_for(self, transcript: str, history: Sequence[ChatMessage]) -> List[ChatMessage]:
+        prefix = [self._full]
+        if self.map_mode == "slice":
+            excerpt = self._excerpt(transcript, history)
+            if excerpt is not None:
+                prefix = [self._persona, {"role": "system", "content": f"Campus map excerpt:\n{excerpt}"}]
+                self.sliced += 1
+
+        tokens = sum(estimate_tokens(message["content"]) for message in prefix)
+        self.requests += 1
+        self.tokens_sent += tokens
+        self.last_tokens = tokens
+        logger.debug("Prompt prefix %d tokens (uncompacted %d)", tokens, self.uncompacted_tokens)
+        return prefix
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "map_mode": self.map_mode,
+            "content_hash": self.content_hash,
+            "uncompacted_tokens": self.uncompacted_tokens,
+            "full_tokens": self.full_tokens,
+            "requests": self.requests,
+            "sliced": self.sliced,
+            "last_tokens": self.last_tokens,
+            "mean_tokens": round(self.tokens_sent / self.requests, 1) if self.requests else None,
+        }
+
+    def _excerpt(self, transcript: str, history: Sequence[ChatMessage]) -> Optional[str]:
+        """Map lines for what the visitor just asked about, or None to send the whole map."""
+        recent = [message["content"] for message in history if message["role"] == "user"]
+        texts = recent[-self.context_turns :] if self.context_turns else []
+        if not texts or texts[-1] != transcript:
+            texts.append(transcript)
+        normalized = " ".join(normalize_transcript(text, self.campus_map) for text in texts)
+
+        numbers = [
+            int(number)
+            for match in _BUILDING_MENTION.finditer(normalized)
+            for number in match.group(1).split()
+        ]
+        words = set(normalized.split())
+        zones = [color for color in self.campus_map.zones if color.lower() in words]
+        return self.campus_map.excerpt(numbers, zones)
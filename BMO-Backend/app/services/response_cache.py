@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import copy
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.services.campus_map import CampusMap
+
+NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17,
+    "eighteen": 18, "nineteen": 19, "twenty": 20,
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6,
+    "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10,
+}
+CONTRACTIONS = {"where's": "where is", "what's": "what is", "how's": "how is", "i'm": "i am"}
+FILLER_WORDS = {"the", "a", "an", "please", "hey", "hi", "hello", "bmo", "um", "uh", "so"}
+BUILDING_WORDS = {"bldg": "building", "buildings": "building"}
+# Dropped only right after "building" ("building number 10", "bldg no. 10"); elsewhere
+# "no" carries meaning ("is there no parking").
+NUMBER_MARKERS = {"number", "no"}
+_PUNCTUATION = re.compile(r"[^\w\s&+]")
+_REPEATED_BUILDING = re.compile(r"\b(building \d+(?: \d+)*)(?: building\b)+")
+
+
+def normalize_transcript(transcript: str, campus_map: CampusMap) -> str:
+    """Collapse phrasing variants ("Where's Building Ten?") into one cache key."""
+    text = transcript.lower().replace("’", "'")
+    for contraction, expanded in CONTRACTIONS.items():
+        text = text.replace(contraction, expanded)
+    text = _PUNCTUATION.sub(" ", text)
+
+    words = []
+    for word in text.split():
+        if word in FILLER_WORDS:
+            continue
+        word = str(NUMBER_WORDS.get(word, word))
+        if word in NUMBER_MARKERS and words and words[-1] == "building":
+            continue
+        words.append(BUILDING_WORDS.get(word, word))
+    text = campus_map.substitute_aliases(" ".join(words))
+    return _REPEATED_BUILDING.sub(r"\1", text).strip()
+
+
+class ResponseCache:
+    """TTL + LRU cache of normalized LLM payloads (and their speech) per transcript key.
+
+    Every lookup carries the current map hash; a different hash drops all entries so
+    answers never outlive the map they were grounded on.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], Optional[Dict[str, str]]]]" = OrderedDict()
+        self._map_hash: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(
+        self, key: str, map_hash: str
+    ) -> Optional[Tuple[Dict[str, Any], Optional[Dict[str, str]]]]:
+        self._check_map(map_hash)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, payload, speech = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(payload), speech
+
+    def put(
+        self,
+        key: str,
+        map_hash: str,
+        payload: Dict[str, Any],
+        speech: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if not key:
+            return
+        self._check_map(map_hash)
+        self._entries[key] = (self._clock() + self.ttl_seconds, copy.deepcopy(payload), speech)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "invalidations": self.invalidations,
+        }
+
+    def _check_map(self, map_hash: str) -> None:
+        if map_hash != self._map_hash:
+            if self._map_hash is not None:
+                self.invalidations += 1
+            self._entries.clear()
+            self._map_hash = map_hash
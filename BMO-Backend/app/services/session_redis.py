@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Tuple
+
+from app.services.session_store import BatchedSessionStore, ChatMessage, MessageRole
+
+
+class RedisSessionStore(BatchedSessionStore):
+    """Session store on any server speaking the Redis protocol (Redis, Valkey, KeyDB...).
+
+    Each session is a capped list of messages plus a capped list of its user questions;
+    both expire after `ttl_seconds` of inactivity, and a sorted set of last-seen times
+    enforces `max_sessions`.
+    """
+
+    def __init__(self, url: str, *, key_prefix: str = "bmo:session", **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("SESSION_BACKEND=redis requires the `redis` package") from exc
+        self.key_prefix = key_prefix
+        self._redis = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def sweep(self) -> int:
+        index = self._index_key()
+        cutoff = self._clock() - self.ttl_seconds
+        expired = await self._redis.zrangebyscore(index, "-inf", cutoff)
+        overflow = await self._redis.zrange(index, 0, -(self.max_sessions + 1))
+        stale = list(dict.fromkeys(expired + overflow))
+        if not stale:
+            return 0
+        pipe = self._redis.pipeline(transaction=False)
+        for session_id in stale:
+            pipe.delete(self._messages_key(session_id), self._questions_key(session_id))
+        pipe.zrem(index, *stale)
+        await pipe.execute()
+        return len(stale)
+
+    async def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": await self._redis.zcard(self._index_key()),
+            "pending": len(self._pending),
+            "batches": self.batches,
+        }
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self._redis.aclose()
+
+    async def _create(self, session_id: str, now: float) -> None:
+        await self._redis.zadd(self._index_key(), {session_id: now})
+
+    async def _write_batch(self, batch: List[Tuple[str, MessageRole, str, float]]) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        touched: Dict[str, float] = {}
+        for session_id, role, content, now in batch:
+            pipe.rpush(self._messages_key(session_id), json.dumps({"role": role, "content": content}))
+            if role == "user":
+                pipe.rpush(self._questions_key(session_id), content)
+            touched[session_id] = now
+        for session_id in touched:
+            self._trim_and_expire(pipe, session_id)
+        pipe.zadd(self._index_key(), touched)
+        await pipe.execute()
+
+    async def _load_window(self, session_id: str, now: float) -> Tuple[List[ChatMessage], List[str]]:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.lrange(self._messages_key(session_id), -self.max_messages, -1)
+        pipe.lrange(self._questions_key(session_id), -self._questions_kept(), -1)
+        self._trim_and_expire(pipe, session_id)
+        pipe.zadd(self._index_key(), {session_id: now}, xx=True)
+        raw_messages, questions = (await pipe.execute())[:2]
+
+        messages: List[ChatMessage] = [json.loads(raw) for raw in raw_messages]
+        # Questions still inside the window are not "earlier" ones.
+        in_window = sum(1 for message in messages if message["role"] == "user")
+        earlier = questions[: len(questions) - in_window] if self.summarize_dropped else []
+        return messages, earlier
+
+    async def _clear(self, session_id: str) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.delete(self._messages_key(session_id), self._questions_key(session_id))
+        pipe.zrem(self._index_key(), session_id)
+        await pipe.execute()
+
+    def _trim_and_expire(self, pipe: Any, session_id: str) -> None:
+        ttl = max(1, int(self.ttl_seconds))
+        pipe.ltrim(self._messages_key(session_id), -self.max_messages, -1)
+        pipe.ltrim(self._questions_key(session_id), -self._questions_kept(), -1)
+        pipe.expire(self._messages_key(session_id), ttl)
+        pipe.expire(self._questions_key(session_id), ttl)
+
+    def _questions_kept(self) -> int:
+        return self.max_messages + self.summary_questions
+
+    def _index_key(self) -> str:
+        return f"{self.key_prefix}s"
+
+    def _messages_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:{session_id}:messages"
+
+    def _questions_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:{session_id}:questions"
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.session_store import BatchedSessionStore, ChatMessage, MessageRole
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id);
+"""
+
+
+class SQLiteSessionStore(BatchedSessionStore):
+    """Session store in a WAL-mode SQLite file shared by every worker on the host.
+
+    All queries run on one dedicated thread so the event loop never blocks on disk I/O.
+    """
+
+    def __init__(self, path: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bmo-sqlite")
+        self._connection: Optional[sqlite3.Connection] = None
+
+    async def sweep(self) -> int:
+        return await self._run(self._sweep_sync, self._clock() - self.ttl_seconds)
+
+    async def stats(self) -> Dict[str, int]:
+        sessions, messages = await self._run(
+            lambda: self._db()
+            .execute("SELECT (SELECT COUNT(*) FROM sessions), (SELECT COUNT(*) FROM messages)")
+            .fetchone()
+        )
+        return {"sessions": sessions, "messages": messages, "pending": len(self._pending), "batches": self.batches}
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=False)
+
+    async def _create(self, session_id: str, now: float) -> None:
+        await self._run(self._touch_sync, [(session_id, now)])
+
+    async def _write_batch(self, batch: List[Tuple[str, MessageRole, str, float]]) -> None:
+        def write() -> None:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT INTO messages (session_id, role, content) VALUES (?, ?, ?)",
+                    [(session_id, role, content) for session_id, role, content, _ in batch],
+                )
+                self._upsert_sessions(db, [(session_id, now) for session_id, _, _, now in batch])
+
+        await self._run(write)
+
+    async def _load_window(self, session_id: str, now: float) -> Tuple[List[ChatMessage], List[str]]:
+        def load() -> Tuple[List[ChatMessage], List[str]]:
+            db = self._db()
+            rows = db.execute(
+                "SELECT id, role, content FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, self.max_messages),
+            ).fetchall()
+            if not rows:
+                return [], []
+            earlier: List[str] = []
+            if self.summarize_dropped:
+                earlier = [
+                    content
+                    for (content,) in db.execute(
+                        "SELECT content FROM messages WHERE session_id = ? AND role = 'user' AND id < ? "
+                        "ORDER BY id DESC LIMIT ?",
+                        (session_id, rows[-1][0], self.summary_questions),
+                    )
+                ]
+                earlier.reverse()
+            with db:
+                db.execute("UPDATE sessions SET last_seen = ? WHERE id = ?", (now, session_id))
+            messages: List[ChatMessage] = [
+                {"role": role, "content": content} for _, role, content in reversed(rows)
+            ]
+            return messages, earlier
+
+        return await self._run(load)
+
+    async def _clear(self, session_id: str) -> None:
+        def clear() -> None:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+        await self._run(clear)
+
+    def _sweep_sync(self, cutoff: float) -> int:
+        db = self._db()
+        with db:
+            expired = db.execute(
+                "DELETE FROM sessions WHERE last_seen < ? OR id IN ("
+                "SELECT id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+                (cutoff, self.max_sessions),
+            ).rowcount
+            db.execute("DELETE FROM messages WHERE session_id NOT IN (SELECT id FROM sessions)")
+            # Keep enough rows per session for the window plus the summary of earlier questions.
+            db.execute(
+                "DELETE FROM messages WHERE id IN (SELECT id FROM ("
+                "SELECT id, ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY id DESC) AS rn "
+                "FROM messages) WHERE rn > ?)",
+                (self.max_messages + 2 * self.summary_questions,),
+            )
+        return expired
+
+    def _touch_sync(self, sessions: List[Tuple[str, float]]) -> None:
+        db = self._db()
+        with db:
+            self._upsert_sessions(db, sessions)
+
+    @staticmethod
+    def _upsert_sessions(db: sqlite3.Connection, sessions: List[Tuple[str, float]]) -> None:
+        db.executemany(
+            "INSERT INTO sessions (id, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)",
+            sessions,
+        )
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
@@ -1,8 +1,15 @@
+import abc
 import asyncio
-from collections import defaultdict
-from typing import Dict, List, Literal, TypedDict
+import contextlib
+import logging
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Callable, Deque, Dict, List, Literal, Optional, Protocol, Sequence, Tuple, TypedDict
 
-MessageRole = Literal["user", "assistant"]
+MessageRole = Literal["user", "assistant", "system"]
+
+logger = logging.getLogger(__name__)
 
 
 class ChatMessage(TypedDict):
@@ -10,27 +17,407 @@ class ChatMessage(TypedDict):
     content: str
 
 
-class SessionStore:
-    """In-memory session store. Replace with Redis or a database for production."""
+def estimate_tokens(content: str) -> int:
+    """Cheap ~4 characters per token estimate plus per-message framing."""
+    return len(content) // 4 + 4
+
+
+def summary_note(questions: Sequence[str], limit: int) -> ChatMessage:
+    recent = "; ".join(f'"{question[:80]}"' for question in list(questions)[-limit:])
+    return {
+        "role": "system",
+        "content": f"Earlier in this conversation the visitor asked: {recent}.",
+    }
+
+
+def render_window(
+    messages: Sequence[ChatMessage],
+    earlier_questions: Sequence[str],
+    *,
+    max_tokens: int,
+    summarize_dropped: bool,
+    summary_questions: int,
+) -> List[ChatMessage]:
+    """Newest messages within `max_tokens`, optionally preceded by a note on earlier questions."""
+    budget = max_tokens
+    start = len(messages)
+    for message in reversed(messages):
+        cost = estimate_tokens(message["content"])
+        # Always keep the newest message, even if it alone exceeds the budget.
+        if start < len(messages) and cost > budget:
+            break
+        budget -= cost
+        start -= 1
+
+    window = list(messages[start:])
+    if not summarize_dropped:
+        return window
+    earlier = list(earlier_questions)
+    earlier.extend(message["content"] for message in messages[:start] if message["role"] == "user")
+    if not earlier:
+        return window
+    return [summary_note(earlier, summary_questions)] + window
+
+
+class SessionBackend(Protocol):
+    """Interface shared by the in-memory, SQLite and Redis session stores."""
+
+    async def create(self, session_id: str) -> None: ...
+
+    async def append(self, session_id: str, role: MessageRole, content: str) -> None: ...
+
+    async def get_history(self, session_id: str) -> List[ChatMessage]: ...
+
+    async def clear(self, session_id: str) -> None: ...
+
+    async def sweep(self) -> int: ...
+
+    def start_sweeper(self, interval_seconds: float = 60.0) -> None: ...
+
+    async def stop_sweeper(self) -> None: ...
+
+    async def stats(self) -> Dict[str, int]: ...
+
+    async def aclose(self) -> None: ...
+
+
+class _Message:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: MessageRole, content: str) -> None:
+        self.role = role
+        self.content = content
+        self.tokens = len(content) // 4 + 4
+
+
+class _Session:
+    __slots__ = ("messages", "tokens", "earlier_questions", "last_seen", "window")
+
+    def __init__(self, now: float, max_messages: int, summary_questions: int) -> None:
+        self.messages: Deque[_Message] = deque(maxlen=max_messages)
+        self.tokens = 0
+        self.earlier_questions: Deque[str] = deque(maxlen=summary_questions)
+        self.last_seen = now
+        # Rendered history, rebuilt lazily after the next append.
+        self.window: Optional[List[ChatMessage]] = None
+
+
+class _Shard:
+    __slots__ = ("sessions",)
 
     def __init__(self) -> None:
-        self._sessions: Dict[str, List[ChatMessage]] = defaultdict(list)
-        self._lock = asyncio.Lock()
+        self.sessions: "OrderedDict[str, _Session]" = OrderedDict()
+
+
+class SessionStore:
+    """In-memory session store. Replace with Redis or a database for production.
+
+    Sessions idle for longer than `ttl_seconds` are swept, the least recently used
+    session is evicted beyond `max_sessions`, and each session keeps only the newest
+    `max_messages` messages. `get_history` further trims to `max_tokens` and, when
+    turns were dropped, prepends a one-line system note listing earlier questions.
+
+    Sessions are spread over `shards` independent LRU maps. Every operation runs without
+    awaiting, so it is atomic on the event loop and needs no lock; sharding keeps
+    LRU bookkeeping local and lets the sweeper yield between shards.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 1800.0,
+        max_sessions: int = 1000,
+        max_messages: int = 20,
+        max_tokens: int = 2000,
+        summarize_dropped: bool = True,
+        summary_questions: int = 5,
+        shards: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.summarize_dropped = summarize_dropped
+        self.summary_questions = summary_questions
+        self._clock = clock
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._count = 0
+        self._sweeper: Optional[asyncio.Task] = None
+        self.evicted = 0
+        self.expired = 0
+
+    async def create(self, session_id: str) -> None:
+        self._touch(session_id)
+
+    async def append(self, session_id: str, role: MessageRole, content: str) -> None:
+        session = self._touch(session_id)
+        messages = session.messages
+        if len(messages) == messages.maxlen:
+            dropped = messages.popleft()
+            session.tokens -= dropped.tokens
+            if dropped.role == "user":
+                session.earlier_questions.append(dropped.content)
+        message = _Message(role, content)
+        messages.append(message)
+        session.tokens += message.tokens
+        session.window = None
+
+    async def get_history(self, session_id: str) -> List[ChatMessage]:
+        shard = self._shard(session_id)
+        session = shard.sessions.get(session_id)
+        if session is None:
+            return []
+        session.last_seen = self._clock()
+        shard.sessions.move_to_end(session_id)
+        if session.window is None:
+            session.window = self._window(session)
+        return list(session.window)
+
+    async def clear(self, session_id: str) -> None:
+        if self._shard(session_id).sessions.pop(session_id, None) is not None:
+            self._count -= 1
+
+    async def sweep(self) -> int:
+        """Drop sessions idle for longer than the TTL; returns how many were removed."""
+        removed = 0
+        for shard in self._shards:
+            cutoff = self._clock() - self.ttl_seconds
+            # Shards are LRU-ordered, so expired sessions sit at the front.
+            while shard.sessions:
+                session_id, session = next(iter(shard.sessions.items()))
+                if session.last_seen >= cutoff:
+                    break
+                del shard.sessions[session_id]
+                removed += 1
+                # Kept exact across the yield below, so a concurrent `_touch` does not
+                # evict live sessions against a stale count.
+                self._count -= 1
+                self.expired += 1
+            await asyncio.sleep(0)
+        return removed
+
+    def start_sweeper(self, interval_seconds: float = 60.0) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever(interval_seconds))
+
+    async def stop_sweeper(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+
+    async def aclose(self) -> None:
+        await self.stop_sweeper()
+
+    def __len__(self) -> int:
+        return self._count
+
+    async def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self),
+            "messages": sum(
+                len(session.messages)
+                for shard in self._shards
+                for session in shard.sessions.values()
+            ),
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+    async def _sweep_forever(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.sweep()
+
+    def _shard(self, session_id: str) -> _Shard:
+        # str hashes are cached on the object, so routing costs one modulo per call.
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _touch(self, session_id: str) -> _Session:
+        shard = self._shard(session_id)
+        session = shard.sessions.get(session_id)
+        if session is None:
+            session = _Session(self._clock(), self.max_messages, self.summary_questions)
+            shard.sessions[session_id] = session
+            self._count += 1
+            while self._count > self.max_sessions:
+                self._evict_oldest()
+        else:
+            session.last_seen = self._clock()
+            shard.sessions.move_to_end(session_id)
+        return session
+
+    def _evict_oldest(self) -> None:
+        # Each shard is LRU-ordered, so the global LRU session is the oldest shard head.
+        oldest: Optional[_Shard] = None
+        oldest_seen = 0.0
+        for shard in self._shards:
+            if shard.sessions:
+                head = next(iter(shard.sessions.values()))
+                if oldest is None or head.last_seen < oldest_seen:
+                    oldest, oldest_seen = shard, head.last_seen
+        if oldest is None:
+            return
+        oldest.sessions.popitem(last=False)
+        self._count -= 1
+        self.evicted += 1
+
+    def _window(self, session: _Session) -> List[ChatMessage]:
+        messages = session.messages
+        start = 0
+        if session.tokens > self.max_tokens:
+            budget = self.max_tokens
+            start = len(messages)
+            for message in reversed(messages):
+                # Always keep the newest message, even if it alone exceeds the budget.
+                if start < len(messages) and message.tokens > budget:
+                    break
+                budget -= message.tokens
+                start -= 1
+
+        window: List[ChatMessage] = [
+            {"role": message.role, "content": message.content}
+            for message in islice(messages, start, None)
+        ]
+        if not self.summarize_dropped or (start == 0 and not session.earlier_questions):
+            return window
+        earlier = list(session.earlier_questions)
+        earlier.extend(
+            message.content for message in islice(messages, 0, start) if message.role == "user"
+        )
+        if not earlier:
+            return window
+        return [summary_note(earlier, self.summary_questions)] + window
+
+
+class BatchedSessionStore(abc.ABC):
+    """Base for out-of-process stores: appends are buffered and written in batches.
+
+    A batch is written when `flush_batch_size` appends are pending, after
+    `flush_interval_seconds`, or before any read, so a worker always reads its own
+    writes. Subclasses implement the abstract storage hooks and `sweep`.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 1800.0,
+        max_sessions: int = 1000,
+        max_messages: int = 20,
+        max_tokens: int = 2000,
+        summarize_dropped: bool = True,
+        summary_questions: int = 5,
+        flush_interval_seconds: float = 0.05,
+        flush_batch_size: int = 64,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.summarize_dropped = summarize_dropped
+        self.summary_questions = summary_questions
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_batch_size = flush_batch_size
+        self._clock = clock
+        self._pending: List[Tuple[str, MessageRole, str, float]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Future] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self.batches = 0
 
     async def create(self, session_id: str) -> None:
-        async with self._lock:
-            if session_id not in self._sessions:
-                self._sessions[session_id] = []
+        await self._create(session_id, self._clock())
 
     async def append(self, session_id: str, role: MessageRole, content: str) -> None:
-        async with self._lock:
-            self._sessions[session_id].append({"role": role, "content": content})
+        self._pending.append((session_id, role, content, self._clock()))
+        if len(self._pending) >= self.flush_batch_size:
+            await self.flush()
+        elif self._flush_timer is None:
+            loop = asyncio.get_running_loop()
+            self._flush_timer = loop.call_later(self.flush_interval_seconds, self._flush_in_background)
 
     async def get_history(self, session_id: str) -> List[ChatMessage]:
-        async with self._lock:
-            return list(self._sessions.get(session_id, []))
+        await self.flush()
+        messages, earlier = await self._load_window(session_id, self._clock())
+        return render_window(
+            messages,
+            earlier,
+            max_tokens=self.max_tokens,
+            summarize_dropped=self.summarize_dropped,
+            summary_questions=self.summary_questions,
+        )
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            try:
+                await self._write_batch(batch)
+            except Exception:
+                # Keep the messages for the next flush instead of losing the turn.
+                self._pending = batch + self._pending
+                raise
+            self.batches += 1
+
+    def _flush_in_background(self) -> None:
+        self._flush_task = asyncio.ensure_future(self.flush())
+        self._flush_task.add_done_callback(self._flushed_in_background)
+
+    def _flushed_in_background(self, task: asyncio.Future) -> None:
+        if task is self._flush_task:
+            self._flush_task = None
+        if not task.cancelled() and task.exception() is not None:
+            # The batch stays pending; the next append or read retries it.
+            logger.warning("Background session flush failed: %r", task.exception())
 
     async def clear(self, session_id: str) -> None:
-        async with self._lock:
-            if session_id in self._sessions:
-                del self._sessions[session_id]
+        self._pending = [entry for entry in self._pending if entry[0] != session_id]
+        await self._clear(session_id)
+
+    def start_sweeper(self, interval_seconds: float = 60.0) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever(interval_seconds))
+
+    async def stop_sweeper(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+
+    async def aclose(self) -> None:
+        await self.stop_sweeper()
+        await self.flush()
+
+    async def _sweep_forever(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.flush()
+            await self.sweep()
+
+    @abc.abstractmethod
+    async def sweep(self) -> int:
+        """Drop expired sessions; returns how many were removed."""
+
+    @abc.abstractmethod
+    async def _create(self, session_id: str, now: float) -> None: ...
+
+    @abc.abstractmethod
+    async def _write_batch(self, batch: List[Tuple[str, MessageRole, str, float]]) -> None: ...
+
+    @abc.abstractmethod
+    async def _clear(self, session_id: str) -> None: ...
+
+    @abc.abstractmethod
+    async def _load_window(
+        self, session_id: str, now: float
+    ) -> Tuple[List[ChatMessage], List[str]]:
+        """Newest `max_messages` messages plus earlier user questions for the summary note."""
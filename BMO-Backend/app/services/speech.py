@@ -1,42 +1,343 @@
 from __future__ import annotations
 
+import asyncio
 import base64
-from typing import Dict
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
 
-import edge_tts
 from fastapi import HTTPException
 
 from app.core.config import Settings
+from app.services.answer_bundle import AnswerBundle
+from app.services.audio_formats import AudioTranscoder
+from app.services.concurrency import SingleFlight, released
+from app.services.metrics import Metrics
+from app.services.model_health import ModelHealthRegistry
+from app.services.model_stats import LatencyTracker
+from app.services.streaming import split_sentences
+from app.services.tts_backends import EdgeTTSBackend, TTSBackend, audio_mime_type, join_audio
+from app.services.tts_cache import AudioCache
+
+logger = logging.getLogger(__name__)
+
+AudioDelivery = Literal["inline", "url", "both"]
+AUDIO_URL_PREFIX = "/api/v1/audio"
 
 
 class SpeechService:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        cache: Optional[AudioCache] = None,
+        recent_clips: int = 64,
+        flights: Optional[SingleFlight] = None,
+        metrics: Optional[Metrics] = None,
+        backends: Optional[Sequence[TTSBackend]] = None,
+        backend_health: Optional[ModelHealthRegistry] = None,
+        bundle: Optional[AnswerBundle] = None,
+        transcoder: Optional[AudioTranscoder] = None,
+    ) -> None:
         self.settings = settings
+        self.metrics = metrics or Metrics()
+        self.cache = cache
+        self.backends: List[TTSBackend] = list(backends) if backends else [EdgeTTSBackend(settings)]
+        # Failover state and latency (seconds per character) per backend.
+        self.backend_health = backend_health or ModelHealthRegistry()
+        self.backend_latency = LatencyTracker()
+        # Identical texts being synthesized at the same time share one backend call.
+        self.flights = flights
+        self.recent_clips = recent_clips
+        # Without a cache, URL-delivered clips still have to outlive the /respond call.
+        self._recent: "OrderedDict[str, bytes]" = OrderedDict()
+        # Prewarmed fixed phrases stay in memory regardless of cache eviction.
+        self._pinned: Dict[str, bytes] = {}
+        # Precomputed clips, read straight from the memory-mapped answer bundle.
+        self.bundle = bundle
+        # Converts clips into the format a client negotiated (see audio_formats.py).
+        self.transcoder = transcoder or AudioTranscoder(
+            settings.tts_ffmpeg_path, settings.tts_backend_timeout_seconds
+        )
 
-    async def synthesize(self, text: str) -> Dict[str, str]:
+    async def synthesize(
+        self, text: str, delivery: AudioDelivery = "inline", audio_format: Optional[str] = None
+    ) -> Dict[str, str]:
         try:
-            audio_bytes = await self._synthesize_edge_audio(text)
-            mime_type = "audio/mpeg"
-            return {
-                "mime_type": mime_type,
-                "base64": base64.b64encode(audio_bytes).decode("utf-8"),
-            }
+            backend, audio_id, audio_bytes = await self._keyed_audio(text, audio_format)
+            payload = {"mime_type": audio_mime_type(audio_bytes), "backend": backend}
+            if delivery != "inline":
+                self._keep_recent(audio_id, audio_bytes)
+                payload.update({"audio_id": audio_id, "url": f"{AUDIO_URL_PREFIX}/{audio_id}"})
+            if delivery != "url":
+                payload["base64"] = base64.b64encode(audio_bytes).decode("utf-8")
+            return payload
+        except HTTPException:
+            raise
         except Exception as exc:  # pragma: no cover
             raise HTTPException(status_code=502, detail=f"TTS failed: {exc}") from exc
 
-    async def _synthesize_edge_audio(self, text: str) -> bytes:
-        communicate = edge_tts.Communicate(
+    def clip(self, audio_id: str) -> Optional[bytes]:
+        """In-memory audio bytes for an audio id handed out by `synthesize`."""
+        if self.cache is not None:
+            audio = self.cache.peek(audio_id)
+            if audio is not None:
+                return audio
+        return self._stored_clip(audio_id) or self._recent.get(audio_id)
+
+    def clip_file(self, audio_id: str) -> Optional[Path]:
+        if self.cache is None:
+            return None
+        return self.cache.file_for(audio_id)
+
+    @property
+    def primary_backend(self) -> str:
+        """The first configured backend. Only its clips answer later requests for a text;
+        clips from a fallback are kept under their own id for URL delivery only."""
+        return self.backends[0].name
+
+    def ordered_backends(self) -> List[TTSBackend]:
+        """Healthy backends first; with `latency` selection, fastest per character first."""
+        by_name = {backend.name: backend for backend in self.backends}
+        names = self.backend_health.order(list(by_name))
+        if self.settings.tts_backend_selection == "latency":
+            names.sort(key=self._speed)
+        return [by_name[name] for name in names]
+
+    def _speed(self, name: str) -> float:
+        observed = self.backend_latency.percentile(name, 50)
+        if observed is not None:
+            return observed
+        # Untried backends go first so they get measured; ones that only ever failed go last.
+        return float("inf") if self.backend_health.breaker(name).failure_rate() else 0.0
+
+    async def start(self) -> None:
+        """Start backends (e.g. spawn and warm the local worker pool)."""
+        results = await asyncio.gather(
+            *(backend.start() for backend in self.backends), return_exceptions=True
+        )
+        for backend, result in zip(self.backends, results):
+            if isinstance(result, Exception):
+                logger.warning("TTS backend %s failed to start: %s", backend.name, result)
+
+    async def aclose(self) -> None:
+        for backend in self.backends:
+            await backend.aclose()
+
+    async def stream(self, text: str, audio_format: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Yield audio chunks as the backend produces them (or the cached clip in one piece).
+
+        A backend that fails before its first chunk is replaced by the next one. A clip
+        in a negotiated `audio_format` is converted whole and yielded in one piece.
+        """
+        if audio_format is not None:
+            _, _, audio = await self._keyed_audio(text, audio_format)
+            yield audio
+            return
+        key = self._cache_key(text)
+        cached = self._stored_clip(key)
+        if cached is None and self.cache is not None:
+            cached = await self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        errors: List[str] = []
+        for backend in self.ordered_backends():
+            breaker = self.backend_health.breaker(backend.name)
+            if not breaker.allow_request():
+                errors.append(f"{backend.name}: recovery probe in flight")
+                continue
+            started = time.perf_counter()
+            audio_chunks: List[bytes] = []
+            try:
+                async for chunk in backend.stream(text):
+                    audio_chunks.append(chunk)
+                    yield chunk
+                if not audio_chunks:
+                    raise RuntimeError("no audio data")
+            except asyncio.CancelledError:
+                if not released():
+                    self.metrics.upstream_cancelled.inc("tts")
+                raise
+            except Exception as exc:
+                breaker.record_failure(type(exc).__name__)
+                if audio_chunks:
+                    raise HTTPException(status_code=502, detail=f"TTS failed: {exc}") from exc
+                errors.append(f"{backend.name}: {exc}")
+                continue
+            self._record_backend_success(backend.name, text, time.perf_counter() - started)
+            if self.cache is not None:
+                await self.cache.put(self._cache_key(text, backend=backend.name), b"".join(audio_chunks))
+            return
+        raise HTTPException(status_code=502, detail="TTS failed: " + " | ".join(errors))
+
+    async def prewarm(self, texts: Iterable[str]) -> None:
+        """Synthesize fixed phrases (e.g. the wake greeting) ahead of time and pin them."""
+        for text in texts:
+            if text:
+                backend, audio = await self._cached_audio(text)
+                if backend == self.primary_backend:
+                    self._pinned[self._cache_key(text)] = audio
+
+    async def keyed_audio(self, text: str, audio_format: Optional[str] = None) -> Tuple[str, bytes]:
+        """Raw audio for `text` with the id under which `clip` and the audio route serve it."""
+        _, audio_id, audio = await self._keyed_audio(text, audio_format)
+        return audio_id, audio
+
+    async def audio(self, text: str, audio_format: Optional[str] = None) -> bytes:
+        """Raw audio for `text` from the bundle, pins or cache, synthesizing it on a miss."""
+        _, _, audio = await self._keyed_audio(text, audio_format)
+        return audio
+
+    async def _keyed_audio(self, text: str, audio_format: Optional[str]) -> Tuple[str, str, bytes]:
+        """(backend, id, audio) for `text` in `audio_format` if it can be converted.
+
+        Clips that were not converted (already in the format, no ffmpeg, or a failed
+        conversion) are the backend's original, so they carry the original's id.
+        """
+        if audio_format is None:
+            backend, audio = await self._cached_audio(text)
+            return backend, self._cache_key(text, backend=backend), audio
+        format_key = self._cache_key(text, audio_format)
+        converted = self._stored_clip(format_key)
+        if converted is None and self.cache is not None:
+            converted = await self.cache.get(format_key)
+        if converted is not None:
+            return self.primary_backend, format_key, converted
+        backend, original = await self._cached_audio(text)
+        key = self._cache_key(text, backend=backend)
+        if not self.transcoder.needs_transcoding(original, audio_format):
+            return backend, key, original
+        format_key = self._cache_key(text, audio_format, backend)
+        factory = lambda: self._transcode_and_store(format_key, original, audio_format)
+        converted = await (factory() if self.flights is None else self.flights.do(format_key, factory))
+        if converted is None:
+            return backend, key, original
+        return backend, format_key, converted
+
+    def _stored_clip(self, key: str) -> Optional[bytes]:
+        pinned = self._pinned.get(key)
+        if pinned is None and self.bundle is not None:
+            # A memoryview into the bundle mapping: bytes-like and never copied.
+            return self.bundle.clip(key)
+        return pinned
+
+    async def _cached_audio(self, text: str) -> Tuple[str, bytes]:
+        """(backend, audio) for `text`: the primary backend's stored clip, else a fresh one."""
+        key = self._cache_key(text)
+        stored = self._stored_clip(key)
+        if stored is not None:
+            return self.primary_backend, stored
+        if self.cache is not None:
+            audio = await self.cache.get(key)
+            if audio is not None:
+                return self.primary_backend, audio
+        sentences = split_sentences(text) if self.settings.tts_sentence_split else []
+        if len(sentences) > 1:
+            factory = lambda: self._synthesize_sentences(text, sentences)
+        else:
+            factory = lambda: self._synthesize_and_store(text)
+        if self.flights is None:
+            return await factory()
+        return await self.flights.do(key, factory)
+
+    async def _synthesize_sentences(self, text: str, sentences: List[str]) -> Tuple[str, bytes]:
+        """Synthesize sentences concurrently (each through the cache) and join them in order.
+
+        MP3 is a sequence of independent frames, so the segments concatenate cleanly; WAV
+        segments are re-wrapped. If failover mixed backends, the whole text is redone.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.settings.tts_sentence_concurrency))
+
+        async def segment(sentence: str) -> Tuple[str, bytes]:
+            async with semaphore:
+                return await self._cached_audio(sentence)
+
+        segments = await asyncio.gather(*(segment(sentence) for sentence in sentences))
+        backends = {backend for backend, _ in segments}
+        try:
+            if len(backends) > 1:
+                raise ValueError("segments from different backends")
+            audio = join_audio([audio for _, audio in segments])
+        except ValueError:
+            return await self._synthesize_and_store(text)
+        backend = backends.pop()
+        # The joined clip is cached too: URL delivery looks clips up by the full text's key.
+        if self.cache is not None:
+            await self.cache.put(self._cache_key(text, backend=backend), audio)
+        return backend, audio
+
+    async def _synthesize_and_store(self, text: str) -> Tuple[str, bytes]:
+        backend, audio = await self._synthesize_audio(text)
+        if self.cache is not None:
+            await self.cache.put(self._cache_key(text, backend=backend), audio)
+        return backend, audio
+
+    async def _transcode_and_store(self, key: str, audio: bytes, audio_format: str) -> Optional[bytes]:
+        """`audio` converted to `audio_format` and cached under `key`; None if ffmpeg failed."""
+        try:
+            converted = await self.transcoder.transcode(audio, audio_format)
+        except (RuntimeError, asyncio.TimeoutError) as exc:
+            # The format is a preference; the caller falls back to the original clip.
+            logger.warning("Converting a clip to %s failed: %s", audio_format, exc)
+            return None
+        self.metrics.transcoded.inc(audio_format)
+        if self.cache is not None:
+            await self.cache.put(key, converted)
+        return converted
+
+    def _keep_recent(self, audio_id: str, audio: bytes) -> None:
+        if self.cache is not None:
+            return
+        self._recent[audio_id] = audio
+        self._recent.move_to_end(audio_id)
+        while len(self._recent) > self.recent_clips:
+            self._recent.popitem(last=False)
+
+    def _cache_key(
+        self, text: str, audio_format: Optional[str] = None, backend: Optional[str] = None
+    ) -> str:
+        """Key of `text` as spoken by `backend` (the primary one by default)."""
+        name = backend or self.primary_backend
+        voice = next(candidate.voice for candidate in self.backends if candidate.name == name)
+        return AudioCache.make_key(
             text,
-            self.settings.edge_tts_voice,
-            rate=self.settings.edge_tts_rate,
-            volume=self.settings.edge_tts_volume,
+            voice,
+            self.settings.edge_tts_rate,
+            self.settings.edge_tts_volume,
+            audio_format,
         )
-        audio_chunks: list[bytes] = []
-        async for chunk in communicate.stream():
-            if chunk["type"] == "audio" and chunk.get("data"):
-                audio_chunks.append(chunk["data"])
 
-        if not audio_chunks:
-            raise HTTPException(status_code=502, detail="TTS failed to produce audio data")
+    async def _synthesize_audio(self, text: str) -> Tuple[str, bytes]:
+        """Try backends in `ordered_backends` order until one returns audio in time."""
+        errors: List[str] = []
+        for backend in self.ordered_backends():
+            breaker = self.backend_health.breaker(backend.name)
+            if not breaker.allow_request():
+                errors.append(f"{backend.name}: recovery probe in flight")
+                continue
+            started = time.perf_counter()
+            try:
+                audio = await asyncio.wait_for(
+                    backend.synthesize(text), self.settings.tts_backend_timeout_seconds
+                )
+                if not audio:
+                    raise RuntimeError("no audio data")
+            except asyncio.CancelledError:
+                if not released():
+                    self.metrics.upstream_cancelled.inc("tts")
+                raise
+            except Exception as exc:
+                breaker.record_failure(type(exc).__name__)
+                errors.append(f"{backend.name}: {exc or type(exc).__name__}")
+                continue
+            self._record_backend_success(backend.name, text, time.perf_counter() - started)
+            return backend.name, audio
+        raise HTTPException(status_code=502, detail="TTS failed: " + " | ".join(errors))
 
-        return b"".join(audio_chunks)
+    def _record_backend_success(self, name: str, text: str, seconds: float) -> None:
+        self.backend_health.breaker(name).record_success(seconds)
+        self.backend_latency.record(name, seconds / max(1, len(text)))
+        self.metrics.tts_seconds.observe(seconds, name)
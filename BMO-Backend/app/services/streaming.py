@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class StreamingField:
+    """Incrementally decodes one string field of a JSON object as deltas arrive.
+
+    Each character is scanned once, so feeding a long completion delta by delta stays
+    linear. `buffer` keeps the whole completion for the final parse.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.buffer = ""
+        self.value: Optional[str] = None
+        self.closed = False
+        self._pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(key))
+        self._searched = 0
+        self._index = 0
+
+    def feed(self, delta: str) -> Optional[str]:
+        """Append a delta and return the value decoded so far (None until the key appears)."""
+        self.buffer += delta
+        if self.closed:
+            return self.value
+        if self.value is None:
+            # Re-check a short overlap in case the key was split across deltas.
+            match = self._pattern.search(self.buffer, max(0, self._searched - len(self.key) - 32))
+            self._searched = len(self.buffer)
+            if not match:
+                return None
+            self.value = ""
+            self._index = match.end()
+        decoded, self._index, self.closed = _decode_string(self.buffer, self._index)
+        self.value += decoded
+        return self.value
+
+
+def _decode_string(buffer: str, index: int) -> Tuple[str, int, bool]:
+    """Decode a JSON string body from `index`; stops before an incomplete escape.
+
+    Returns the decoded text, the index to resume from and whether the closing quote
+    was reached.
+    """
+    decoded: list[str] = []
+    while index < len(buffer):
+        char = buffer[index]
+        if char == '"':
+            return "".join(decoded), index + 1, True
+        if char != "\\":
+            decoded.append(char)
+            index += 1
+            continue
+        if index + 1 >= len(buffer):
+            break
+        escape = buffer[index + 1]
+        if escape == "u":
+            digits = buffer[index + 2 : index + 6]
+            if len(digits) < 4:
+                break
+            try:
+                decoded.append(chr(int(digits, 16)))
+            except ValueError:
+                decoded.append(digits)
+            index += 6
+            continue
+        decoded.append(_ESCAPES.get(escape, escape))
+        index += 2
+    return "".join(decoded), index, False
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def last_sentence_boundary(text: str, start: int = 0) -> int:
+    """Return the end offset of the last complete sentence after `start`, or `start`."""
+    boundary = start
+    for match in SENTENCE_BOUNDARY.finditer(text, start):
+        boundary = match.end()
+    return boundary
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import multiprocessing
+import shutil
+import subprocess
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol, Sequence
+
+import edge_tts
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+def audio_mime_type(audio: bytes) -> str:
+    """MIME type of a clip from its magic bytes; edge-tts MP3 unless it is WAV or WebM."""
+    if audio[:4] == b"RIFF" and audio[8:12] == b"WAVE":
+        return "audio/wav"
+    if audio[:4] == b"\x1a\x45\xdf\xa3":
+        return "audio/webm"
+    return "audio/mpeg"
+
+
+def join_audio(segments: Sequence[bytes]) -> bytes:
+    """Concatenate clips of one format. MP3 frames join as-is; WAV PCM is re-wrapped.
+
+    Raises ValueError for mixed formats or WAV segments with different parameters.
+    """
+    if not segments:
+        return b""
+    kinds = {audio_mime_type(segment) for segment in segments}
+    if kinds == {"audio/mpeg"}:
+        return b"".join(segments)
+    if kinds != {"audio/wav"}:
+        raise ValueError("cannot join clips of different formats")
+    params = None
+    frames: List[bytes] = []
+    for segment in segments:
+        with wave.open(io.BytesIO(segment), "rb") as reader:
+            current = reader.getparams()[:3]
+            if params is not None and current != params:
+                raise ValueError("cannot join WAV clips with different formats")
+            params = current
+            frames.append(reader.readframes(reader.getnframes()))
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(params[0])
+        writer.setsampwidth(params[1])
+        writer.setframerate(params[2])
+        writer.writeframes(b"".join(frames))
+    return output.getvalue()
+
+
+class TTSBackend(Protocol):
+    name: str
+    # Identifies the voice a backend speaks with; part of the audio cache key.
+    voice: str
+
+    async def synthesize(self, text: str) -> bytes: ...
+
+    def stream(self, text: str) -> AsyncIterator[bytes]: ...
+
+    async def start(self) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+class EdgeTTSBackend:
+    """Microsoft Edge online voices (MP3); needs a network round trip per utterance."""
+
+    name = "edge"
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.voice = settings.edge_tts_voice
+
+    async def synthesize(self, text: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(text)])
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        communicate = edge_tts.Communicate(
+            text,
+            self.settings.edge_tts_voice,
+            rate=self.settings.edge_tts_rate,
+            volume=self.settings.edge_tts_volume,
+        )
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio" and chunk.get("data"):
+                yield chunk["data"]
+
+    async def start(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+
+# Per worker process: the loaded engine, created once by `_init_worker`.
+_worker_engine: Dict[str, Any] = {}
+
+
+def _init_worker(engine: str, model_path: Optional[str], voice: str) -> None:
+    if engine == "piper":
+        from piper.voice import PiperVoice  # optional dependency: pip install piper-tts
+
+        _worker_engine["voice"] = PiperVoice.load(model_path)
+    else:
+        binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if binary is None:
+            raise RuntimeError("espeak-ng is not installed")
+        _worker_engine["espeak"] = binary
+    _worker_engine["voice_name"] = voice
+
+
+def _synthesize_in_worker(text: str) -> bytes:
+    """WAV bytes for `text`, synthesized in a pool process."""
+    voice = _worker_engine.get("voice")
+    if voice is not None:
+        output = io.BytesIO()
+        with wave.open(output, "wb") as writer:
+            # piper-tts >= 1.3 renamed synthesize() to synthesize_wav().
+            if hasattr(voice, "synthesize_wav"):
+                voice.synthesize_wav(text, writer)
+            else:
+                voice.synthesize(text, writer)
+        return output.getvalue()
+    completed = subprocess.run(
+        # "--" keeps text starting with "-" from being read as an option.
+        [_worker_engine["espeak"], "--stdout", "-v", _worker_engine["voice_name"], "--", text],
+        capture_output=True,
+        check=True,
+        timeout=30,
+    )
+    return completed.stdout
+
+
+class LocalTTSBackend:
+    """Offline CPU synthesis (piper or espeak-ng, WAV) in a pre-warmed process pool.
+
+    Each worker loads the voice once in its initializer; `start` spawns every worker
+    and runs a warm-up utterance so the first real request pays no load time.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        *,
+        engine: str = "espeak",
+        model_path: Optional[str] = None,
+        voice: str = "en-us",
+        workers: int = 2,
+    ) -> None:
+        if engine == "piper" and not model_path:
+            raise ValueError("TTS_LOCAL_MODEL_PATH is required for the piper engine")
+        self.engine = engine
+        self.voice = f"local:{engine}:{model_path if engine == 'piper' else voice}"
+        self.workers = max(1, workers)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # Never fork the running event loop and its sockets into the workers.
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(engine, model_path, voice),
+        )
+
+    async def synthesize(self, text: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _synthesize_in_worker, text)
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        yield await self.synthesize(text)
+
+    async def start(self) -> None:
+        await asyncio.gather(*(self.synthesize("Ready.") for _ in range(self.workers)))
+
+    async def aclose(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_backends(settings: Settings) -> List[TTSBackend]:
+    """Backends named in `TTS_BACKENDS`, in preference order."""
+    backends: List[TTSBackend] = []
+    for name in settings.tts_backends:
+        if name == "edge":
+            backends.append(EdgeTTSBackend(settings))
+        elif name == "local":
+            backends.append(
+                LocalTTSBackend(
+                    engine=settings.tts_local_engine,
+                    model_path=settings.tts_local_model_path,
+                    voice=settings.tts_local_voice,
+                    workers=settings.tts_local_workers,
+                )
+            )
+        else:
+            raise ValueError(f"Unknown TTS backend: {name}")
+    return backends
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services.tts_backends import audio_mime_type
+
+# Disk tier file extension per clip type, so the files open with the right player.
+SUFFIXES = {"audio/mpeg": ".mp3", "audio/wav": ".wav", "audio/webm": ".webm"}
+
+
+class AudioCache:
+    """Content-addressed audio cache: bounded in-memory LRU with an optional disk tier."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_suffixes: Dict[str, str] = {}
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self.bytes_stored = 0
+        if self.disk_dir:
+            self._scan_disk()
+
+    @staticmethod
+    def make_key(text: str, voice: str, rate: str, volume: str, audio_format: Optional[str] = None) -> str:
+        parts = (voice, rate, volume, text) if audio_format is None else (voice, rate, volume, text, audio_format)
+        material = "\x1f".join(parts)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.bytes_served += len(audio)
+            return audio
+
+        if self.disk_dir and key in self._disk_index:
+            try:
+                audio = await asyncio.to_thread(self._disk_path(key).read_bytes)
+            except FileNotFoundError:
+                self._forget_disk(key)
+            else:
+                self._disk_index.move_to_end(key)
+                self._remember(key, audio)
+                self.hits += 1
+                self.disk_hits += 1
+                self.bytes_served += len(audio)
+                return audio
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        self.bytes_stored += len(audio)
+        self._remember(key, audio)
+        if self.disk_dir and key not in self._disk_index:
+            self._disk_suffixes[key] = SUFFIXES.get(audio_mime_type(audio), ".mp3")
+            await asyncio.to_thread(self._write_file, key, audio)
+            self._disk_index[key] = len(audio)
+            self._disk_bytes += len(audio)
+            evicted = []
+            while self._disk_index and self._disk_bytes > self.disk_max_bytes:
+                oldest = next(iter(self._disk_index))
+                evicted.append(self._disk_path(oldest))
+                self._forget_disk(oldest)
+            if evicted:
+                await asyncio.to_thread(self._unlink_files, evicted)
+
+    def peek(self, key: str) -> Optional[bytes]:
+        """In-memory clip for `key` without touching the disk tier."""
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.bytes_served += len(audio)
+        return audio
+
+    def file_for(self, key: str) -> Optional[Path]:
+        """Disk tier path for `key`, if the clip was written there."""
+        if not self.disk_dir or key not in self._disk_index:
+            return None
+        self.disk_hits += 1
+        return self._disk_path(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk_index),
+            "disk_bytes": self._disk_bytes,
+            "bytes_served": self.bytes_served,
+            "bytes_stored": self.bytes_stored,
+        }
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._entries[key] = audio
+        self._memory_bytes += len(audio)
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._memory_bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}{self._disk_suffixes.get(key, '.mp3')}"
+
+    def _scan_disk(self) -> None:
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        files = sorted(
+            (path for suffix in set(SUFFIXES.values()) for path in self.disk_dir.glob(f"*{suffix}")),
+            key=lambda path: path.stat().st_mtime,
+        )
+        for path in files:
+            size = path.stat().st_size
+            self._disk_index[path.stem] = size
+            self._disk_suffixes[path.stem] = path.suffix
+            self._disk_bytes += size
+
+    def _write_file(self, key: str, audio: bytes) -> None:
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _unlink_files(paths: List[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def _forget_disk(self, key: str) -> None:
+        self._disk_suffixes.pop(key, None)
+        size = self._disk_index.pop(key, 0)
+        self._disk_bytes -= size
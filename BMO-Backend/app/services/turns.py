@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException
+
+from app.services.metrics import Metrics
+
+T = TypeVar("T")
+
+
+class TurnCancelled(HTTPException):
+    """409 for a turn that was superseded by a newer transcript for the same session."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(status_code=409, detail=f"This question was {reason} before BMO answered.")
+        self.reason = reason
+
+
+class _Turn:
+    __slots__ = ("task", "reason")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.reason: Optional[str] = None
+
+
+class TurnRegistry:
+    """The in-flight turn of every session.
+
+    Starting a turn cancels the one it supersedes, which cancels that turn's
+    OpenRouter and TTS calls with it. Callers that notice their client is gone
+    cancel their own turn through `cancel`.
+    """
+
+    def __init__(self, metrics: Optional[Metrics] = None) -> None:
+        self.metrics = metrics or Metrics()
+        self._turns: Dict[str, _Turn] = {}
+        self.started = 0
+        self.cancelled: Counter = Counter()
+
+    async def run(self, session_id: str, work: Awaitable[T]) -> T:
+        """Await `work` as the session's current turn; raises TurnCancelled if superseded."""
+        turn = _Turn(asyncio.ensure_future(work))
+        previous = self._turns.get(session_id)
+        if previous is not None and not previous.task.done():
+            previous.reason = "superseded"
+            self.cancel(previous.task, "superseded")
+        self._turns[session_id] = turn
+        self.started += 1
+        try:
+            return await turn.task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if turn.reason is None or (current is not None and current.cancelling()):
+                raise
+            raise TurnCancelled(turn.reason) from None
+        finally:
+            if self._turns.get(session_id) is turn:
+                del self._turns[session_id]
+
+    def cancel(self, task: asyncio.Task, reason: str) -> bool:
+        """Cancel a turn's task (e.g. on client disconnect) and count the work saved."""
+        if task.done():
+            return False
+        task.cancel()
+        self.cancelled[reason] += 1
+        self.metrics.turns_cancelled.inc(reason)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._turns),
+            "started": self.started,
+            "cancelled": dict(self.cancelled),
+            "upstream_cancelled": {
+                kind: int(self.metrics.upstream_cancelled.value(kind)) for kind in ("llm", "tts")
+            },
+        }
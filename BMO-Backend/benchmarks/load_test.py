@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Offline load test: the real app against local OpenRouter and edge-tts stand-ins.
+
+A fake chat-completions server (configurable latency, 429 rate and malformed-JSON
+rate) runs on a loopback port and the app is started with `OPENROUTER_BASE_URL`
+pointed at it; edge-tts is replaced by a synthesizer that sleeps and returns
+MP3-sized bytes. Virtual kiosks then run `/wake` followed by several `/respond`
+turns at the chosen concurrency. The report has throughput, p50/p95/p99 latency
+per endpoint, status codes, upstream call counts and how much memory the
+in-memory SessionStore retained. Save it with `--output` and compare a later run
+with `--baseline`.
+
+    python -m benchmarks.load_test --sessions 200 --turns 4 --concurrency 32 --output run.json
+    python -m benchmarks.load_test --baseline run.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+QUESTIONS = [
+    "Where is building {n}?",
+    "How do I get to building {n} from here?",
+    "Who works in building {n}?",
+    "What can I study in building {n}?",
+    "Is there a place to eat near building {n}?",
+    "Tell me something fun about building {n}.",
+]
+# Roughly 48 kbit/s MP3 at a speaking rate of ~15 characters per second.
+MP3_BYTES_PER_CHAR = 400
+
+
+@dataclass
+class FakeUpstream:
+    latency_ms: float = 400.0
+    jitter_ms: float = 150.0
+    rate_429: float = 0.02
+    malformed_rate: float = 0.01
+
+
+def fake_openrouter_app(config: FakeUpstream, counters: Counter, rng: random.Random) -> FastAPI:
+    """Just enough of the OpenRouter chat-completions API for the backend."""
+    fake = FastAPI()
+
+    @fake.head("/api/v1/models")
+    async def models() -> None:
+        return None
+
+    @fake.post("/api/v1/chat/completions")
+    async def chat(request: Request):
+        payload = await request.json()
+        counters["calls"] += 1
+        await asyncio.sleep(max(0.0, rng.gauss(config.latency_ms, config.jitter_ms)) / 1000)
+        if rng.random() < config.rate_429:
+            counters["429"] += 1
+            return JSONResponse({"error": {"message": "Rate limit exceeded"}}, status_code=429)
+        question = payload["messages"][-1]["content"]
+        content = json.dumps(
+            {
+                "thought": "The visitor wants directions.",
+                "voice_response": f"Good question about '{question[:60]}'. Start at the Central Library. Then follow the signs.",
+                "navigation_display": {
+                    "target_building": "Building 10",
+                    "zone_color": "Yellow",
+                    "direction_guide": "Walk west from Building 3. Enter the Yellow Zone.",
+                },
+                "emotion": "happy",
+            }
+        )
+        if rng.random() < config.malformed_rate:
+            counters["malformed"] += 1
+            content = content[: len(content) // 2]
+        if not payload.get("stream"):
+            return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+        async def events() -> AsyncIterator[str]:
+            for start in range(0, len(content), 24):
+                delta = {"choices": [{"delta": {"content": content[start : start + 24]}}]}
+                yield f"data: {json.dumps(delta)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return fake
+
+
+def install_fake_tts(latency_ms: float, counters: Counter) -> None:
+    """Replace the edge-tts backend with a sleeping stand-in."""
+    from app.services.tts_backends import EdgeTTSBackend
+
+    async def fake_stream(self, text: str) -> AsyncIterator[bytes]:
+        counters["tts"] += 1
+        await asyncio.sleep(latency_ms / 1000)
+        yield b"\xff\xf3" * (len(text) * MP3_BYTES_PER_CHAR // 2)
+
+    EdgeTTSBackend.stream = fake_stream
+
+
+class ServerThread:
+    """Runs an ASGI app with uvicorn on its own thread and event loop."""
+
+    def __init__(self, app: Any) -> None:
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self.port = self._socket.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True)
+
+    def __enter__(self) -> "ServerThread":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def retained_bytes(root: Any) -> int:
+    """Bytes reachable from `root`, counting each object once."""
+    seen = set()
+    pending = deque([root])
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return total
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def pick(percentile: float) -> float:
+        return round(1000 * ordered[min(len(ordered) - 1, int(percentile / 100 * len(ordered)))], 1)
+
+    return {"count": len(ordered), "p50": pick(50), "p95": pick(95), "p99": pick(99), "max": round(1000 * ordered[-1], 1)}
+
+
+async def drive(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+    next_session = iter(range(args.sessions))
+
+    async def timed(client: httpx.AsyncClient, endpoint: str, **kwargs: Any) -> Optional[dict]:
+        started = time.perf_counter()
+        response = await client.post(f"/api/v1/conversation/{endpoint}", **kwargs)
+        statuses[f"{endpoint} {response.status_code}"] += 1
+        if response.status_code != 200:
+            return None
+        latencies[endpoint].append(time.perf_counter() - started)
+        return response.json()
+
+    async def kiosk(client: httpx.AsyncClient) -> None:
+        for _ in next_session:
+            wake = await timed(client, "wake")
+            if wake is None:
+                continue
+            for _ in range(args.turns):
+                transcript = rng.choice(QUESTIONS).format(n=rng.randint(1, 17))
+                await timed(
+                    client,
+                    "respond",
+                    json={"session_id": wake["session_id"], "transcript": transcript},
+                )
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(kiosk(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        sessions = (await client.get("/api/v1/diagnostics/sessions")).json()
+
+    requests = sum(len(samples) for samples in latencies.values())
+    return {
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(requests / elapsed, 1),
+        "turns_per_second": round(len(latencies["respond"]) / elapsed, 1),
+        "latency_ms": {endpoint: percentiles(samples) for endpoint, samples in latencies.items()},
+        "statuses": dict(sorted(statuses.items())),
+        "session_store": sessions,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Relative change per headline number; negative latency / positive throughput is better."""
+
+    def change(new: Optional[float], old: Optional[float]) -> Optional[str]:
+        if new is None or not old:
+            return None
+        return f"{100 * (new - old) / old:+.1f}%"
+
+    report: Dict[str, Any] = {
+        "requests_per_second": change(current["requests_per_second"], baseline["requests_per_second"]),
+        "session_store_retained_kib": change(
+            current["session_store_retained_kib"], baseline.get("session_store_retained_kib")
+        ),
+    }
+    for endpoint, stats in current["latency_ms"].items():
+        old = baseline["latency_ms"].get(endpoint, {})
+        report[endpoint] = {key: change(stats[key], old.get(key)) for key in ("p50", "p95", "p99")}
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=4, help="/respond calls per session")
+    parser.add_argument("--concurrency", type=int, default=32, help="kiosks running at once")
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=150.0)
+    parser.add_argument("--rate-429", type=float, default=0.02)
+    parser.add_argument("--malformed-rate", type=float, default=0.01)
+    parser.add_argument("--tts-latency-ms", type=float, default=250.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    upstream = FakeUpstream(args.llm_latency_ms, args.llm_jitter_ms, args.rate_429, args.malformed_rate)
+    counters: Counter = Counter()
+    with ServerThread(fake_openrouter_app(upstream, counters, random.Random(args.seed))) as fake:
+        # Settings are read on first import, so configure them before loading the app.
+        os.environ.setdefault("OPENROUTER_API_KEY", "load-test")
+        os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{fake.port}/api/v1"
+        os.environ["OPENROUTER_HTTP2"] = "false"
+        os.environ["OPENROUTER_MAX_CONNECTIONS"] = str(max(args.concurrency, 20))
+        install_fake_tts(args.tts_latency_ms, counters)
+
+        from app.dependencies import get_session_store
+        from app.main import app
+        from app.services.session_store import SessionStore
+
+        with ServerThread(app) as server:
+            result = asyncio.run(drive(f"http://127.0.0.1:{server.port}", args))
+            store = get_session_store()
+            if isinstance(store, SessionStore):
+                retained = retained_bytes(store._shards)
+                result["session_store_retained_kib"] = round(retained / 1024, 1)
+                result["session_store_bytes_per_session"] = round(retained / max(1, len(store)))
+
+    report = {
+        "config": {**{k: v for k, v in vars(args).items() if k not in ("output", "baseline")}, "upstream": asdict(upstream)},
+        **result,
+        "upstream": {"llm_calls": counters["calls"], "llm_429": counters["429"], "llm_malformed": counters["malformed"], "tts_calls": counters["tts"]},
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            report["vs_baseline"] = compare(report, json.load(handle))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Token report: static prompt prefix size per request, before and after compaction.
+
+"before" is what every OpenRouter call used to carry: the raw `aiu_map.md` and
+SYSTEM_PROMPT as two system messages. "full" is the compacted, single cached
+prefix and "slice" the persona plus only the map lines about what was asked.
+Token counts use the same ~4 characters per token estimate as the session store.
+
+    python -m benchmarks.prompt_prefix_bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict, List
+
+from app.services.conversation import SYSTEM_PROMPT
+from app.services.map_loader import MapLoader
+from app.services.prompt_prefix import PromptPrefix
+
+TRANSCRIPTS = [
+    "Where is building ten?",
+    "How do I get to the hospital?",
+    "Which buildings are in the blue zone?",
+    "Where can I study pharmacy?",
+    "Who is the president of the university?",
+    "Tell me something fun about the engineers.",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("transcripts", nargs="*", default=TRANSCRIPTS)
+    args = parser.parse_args()
+
+    campus_map = MapLoader(system_prompt=SYSTEM_PROMPT).current.campus_map
+    full = PromptPrefix(campus_map, SYSTEM_PROMPT, map_mode="full")
+    sliced = PromptPrefix(campus_map, SYSTEM_PROMPT, map_mode="slice")
+    rows: List[Dict[str, object]] = []
+    for transcript in args.transcripts:
+        history = [{"role": "user", "content": transcript}]
+        full.messages_for(transcript, history)
+        sliced.messages_for(transcript, history)
+        rows.append(
+            {
+                "transcript": transcript,
+                "before": full.uncompacted_tokens,
+                "full": full.last_tokens,
+                "slice": sliced.last_tokens,
+            }
+        )
+    print(
+        json.dumps(
+            {"content_hash": full.content_hash, "requests": rows, "full": full.snapshot(), "slice": sliced.snapshot()},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
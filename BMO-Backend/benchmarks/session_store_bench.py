@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Microbenchmark: SessionStore throughput with many concurrent sessions.
+
+Compares the original single-lock, dict-per-message store against the current
+sharded store. Each simulated kiosk session runs the /respond access pattern
+(append user, read history, append assistant) for several turns. Besides raw
+operations per second it reports retained memory and how many estimated prompt
+tokens each history read hands to OpenRouter, which is where bounding pays off.
+
+    python -m benchmarks.session_store_bench --sessions 1000 --turns 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List
+
+from app.services.session_store import SessionStore, estimate_tokens
+
+
+class LegacySessionStore:
+    """The store as it was before sharding: one global lock, unbounded dict lists."""
+
+    def __init__(self) -> None:
+        self._sessions: Dict[str, List[dict]] = defaultdict(list)
+        self._lock = asyncio.Lock()
+
+    async def create(self, session_id: str) -> None:
+        async with self._lock:
+            if session_id not in self._sessions:
+                self._sessions[session_id] = []
+
+    async def append(self, session_id: str, role: str, content: str) -> None:
+        async with self._lock:
+            self._sessions[session_id].append({"role": role, "content": content})
+
+    async def get_history(self, session_id: str) -> List[dict]:
+        async with self._lock:
+            return list(self._sessions.get(session_id, []))
+
+
+async def _kiosk(store, session_id: str, turns: int, prompt_tokens: List[int]) -> None:
+    await store.create(session_id)
+    await store.append(session_id, "assistant", "Hey there! I'm BMO.")
+    for turn in range(turns):
+        await store.append(session_id, "user", f"How do I get to building {turn % 17 + 1}?")
+        history = await store.get_history(session_id)
+        prompt_tokens.append(sum(estimate_tokens(message["content"]) for message in history))
+        # Yield like a real request would while waiting on OpenRouter.
+        await asyncio.sleep(0)
+        await store.append(
+            session_id,
+            "assistant",
+            "Walk west from the Central Library into the Yellow Zone and follow the signs.",
+        )
+
+
+async def _run(store, sessions: int, turns: int) -> Dict[str, float]:
+    prompt_tokens: List[int] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(_kiosk(store, f"session-{index}", turns, prompt_tokens) for index in range(sessions))
+    )
+    elapsed = time.perf_counter() - started
+    operations = sessions * (2 + turns * 3)
+    return {
+        "seconds": round(elapsed, 4),
+        "ops_per_second": round(operations / elapsed),
+        "mean_prompt_tokens": round(sum(prompt_tokens) / len(prompt_tokens), 1),
+        "max_prompt_tokens": max(prompt_tokens),
+    }
+
+
+async def _retained_kib(factory, sessions: int, turns: int) -> float:
+    # Measured in a separate run: tracemalloc would distort the timings above.
+    tracemalloc.start()
+    store = factory()
+    await asyncio.gather(*(_kiosk(store, f"session-{index}", turns, []) for index in range(sessions)))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(current / 1024, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for name, factory in (
+        ("before", LegacySessionStore),
+        ("after", lambda: SessionStore(max_sessions=args.sessions)),
+    ):
+        runs = [asyncio.run(_run(factory(), args.sessions, args.turns)) for _ in range(args.repeat)]
+        results[name] = min(runs, key=lambda run: run["seconds"])
+        results[name]["retained_kib"] = asyncio.run(_retained_kib(factory, args.sessions, args.turns))
+    print(json.dumps({"sessions": args.sessions, "turns": args.turns, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
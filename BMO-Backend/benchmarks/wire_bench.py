@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Bytes on the wire for /respond per audio format and response encoding.
+
+The real app runs under uvicorn with edge-tts replaced by a stand-in that returns
+incompressible MP3-sized audio (48 kbit/s) and ffmpeg replaced by one that scales a
+clip to the target format's bitrate, so the numbers need no network or ffmpeg.
+Questions are drawn only from those the local map navigator answers, so no
+OpenRouter calls are made.
+Each scenario sends the same /respond turns and reports the body bytes received
+(after Content-Encoding), the decoded JSON size and the change against the
+uncompressed native-MP3 baseline. JSON serialization time of one response body
+with the standard library and with orjson is reported as well.
+
+    python -m benchmarks.wire_bench --turns 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from benchmarks.load_test import MP3_BYTES_PER_CHAR, ServerThread, percentiles
+
+QUESTIONS = [
+    "Take me to building {n}",
+    "How do I get to building {n}?",
+    "Directions to the {zone} zone",
+    "Where is the {zone} zone?",
+]
+BUILDINGS = [1, 3, 7, 8, 9, 10, 11, 13, 14, 15, 17]
+ZONES = ["red", "blue", "yellow"]
+# (name, audio_format, Accept-Encoding)
+SCENARIOS = [
+    ("baseline: mp3 48k, identity", None, "identity"),
+    ("mp3 48k, gzip", None, "gzip"),
+    ("mp3-low 24k, gzip", "mp3-low", "gzip"),
+    ("opus 16k, gzip", "opus", "gzip"),
+    ("opus 16k, br", "opus", "br"),
+]
+
+
+def install_fakes() -> None:
+    """Edge-tts and ffmpeg stand-ins producing realistically sized, incompressible clips."""
+    from app.services.audio_formats import AUDIO_FORMATS, AudioTranscoder
+    from app.services.tts_backends import EdgeTTSBackend
+
+    async def fake_stream(self, text: str) -> AsyncIterator[bytes]:
+        noise = random.Random(text).randbytes(len(text) * MP3_BYTES_PER_CHAR)
+        yield b"\xff\xf3" + noise[2:]
+
+    async def fake_transcode(self, audio: bytes, audio_format: str) -> bytes:
+        target = AUDIO_FORMATS[audio_format]
+        size = len(audio) * target.bitrate_kbps // AUDIO_FORMATS["mp3"].bitrate_kbps
+        magic = b"\x1a\x45\xdf\xa3" if target.mime_type == "audio/webm" else b"\xff\xf3"
+        return magic + bytes(audio[len(magic) : size])
+
+    EdgeTTSBackend.stream = fake_stream
+    AudioTranscoder.available = property(lambda self: True)
+    AudioTranscoder.transcode = fake_transcode
+
+
+def transcripts(turns: int, seed: int) -> List[str]:
+    """`turns` questions, limited to those the current campus map answers locally."""
+    from app.services.conversation import SYSTEM_PROMPT
+    from app.services.map_loader import MapLoader
+
+    navigator = MapLoader(system_prompt=SYSTEM_PROMPT).current.navigator
+    candidates = dict.fromkeys(
+        question.format(n=number, zone=zone)
+        for question in QUESTIONS
+        for number in BUILDINGS
+        for zone in ZONES
+    )
+    answerable = [question for question in candidates if navigator.answer(question) is not None]
+    rng = random.Random(seed)
+    return [rng.choice(answerable) for _ in range(turns)]
+
+
+async def run_scenario(
+    base_url: str, questions: List[str], audio_format: Optional[str], encoding: str
+) -> Dict[str, Any]:
+    wire = decoded = 0
+    latencies: List[float] = []
+    encodings = set()
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, headers={"Accept-Encoding": encoding}) as client:
+        session_id = (await client.post("/api/v1/conversation/wake")).json()["session_id"]
+        for transcript in questions:
+            body: Dict[str, Any] = {"session_id": session_id, "transcript": transcript}
+            if audio_format:
+                body["audio_format"] = audio_format
+            started = time.perf_counter()
+            response = await client.post("/api/v1/conversation/respond", json=body)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+            wire += response.num_bytes_downloaded
+            decoded += len(response.content)
+            encodings.add(response.headers.get("content-encoding", "identity"))
+            mime_type = response.json()["speech"]["mime_type"]
+    return {
+        "wire_bytes_per_turn": wire // len(questions),
+        "json_bytes_per_turn": decoded // len(questions),
+        "content_encoding": ",".join(sorted(encodings)),
+        "mime_type": mime_type,
+        "latency_ms": percentiles(latencies),
+    }
+
+
+def serialization_ms(payload: Dict[str, Any], rounds: int = 200) -> Dict[str, float]:
+    import orjson
+
+    def timed(dump) -> float:
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            dump(payload)
+            samples.append(time.perf_counter() - started)
+        return round(1000 * statistics.median(samples), 3)
+
+    return {
+        "json": timed(lambda value: json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")),
+        "orjson": timed(orjson.dumps),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=40, help="/respond calls per scenario")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "wire-bench")
+    os.environ["OPENROUTER_PREWARM"] = "false"
+    os.environ["TTS_BACKENDS"] = '["edge"]'
+    install_fakes()
+
+    from app.core.compression import brotli
+    from app.main import app
+
+    questions = transcripts(args.turns, args.seed)
+    results: Dict[str, Any] = {}
+    with ServerThread(app) as server:
+        base_url = f"http://127.0.0.1:{server.port}"
+        for name, audio_format, encoding in SCENARIOS:
+            if encoding == "br" and brotli is None:
+                results[name] = "skipped: pip install brotli"
+                continue
+            results[name] = asyncio.run(run_scenario(base_url, questions, audio_format, encoding))
+        sample = httpx.post(
+            f"{base_url}/api/v1/conversation/respond",
+            json={"session_id": "wire-bench", "transcript": questions[0]},
+            timeout=60,
+        ).json()
+
+    baseline = results[SCENARIOS[0][0]]["wire_bytes_per_turn"]
+    for result in results.values():
+        if isinstance(result, dict):
+            result["vs_baseline"] = f"{100 * (result['wire_bytes_per_turn'] - baseline) / baseline:+.1f}%"
+    report = {
+        "config": vars(args),
+        "scenarios": results,
+        "respond_serialization_ms": serialization_ms(sample),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Behavior of the session stores: the batched SQLite and Redis stores, and the in-memory one."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, List
+
+import pytest
+
+from app.services.session_redis import RedisSessionStore
+from app.services.session_sqlite import SQLiteSessionStore
+from app.services.session_store import BatchedSessionStore, SessionStore
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_store(request, tmp_path) -> Callable[..., BatchedSessionStore]:
+    """Factory for stores sharing one database, as workers on one host do."""
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+
+    def make(**kwargs) -> BatchedSessionStore:
+        # Flushes happen only when the tests ask for them (or before a read).
+        kwargs.setdefault("flush_interval_seconds", 3600.0)
+        if request.param == "sqlite":
+            return SQLiteSessionStore(str(tmp_path / "sessions.db"), **kwargs)
+        store = RedisSessionStore("redis://localhost", **kwargs)
+        store._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        return store
+
+    return make
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+async def add_turns(store: BatchedSessionStore, session_id: str, turns: int) -> None:
+    for turn in range(turns):
+        await store.append(session_id, "user", f"question {turn}")
+        await store.append(session_id, "assistant", f"answer {turn}")
+
+
+def contents(history: List[dict]) -> List[str]:
+    return [message["content"] for message in history]
+
+
+async def test_read_flushes_pending_batch(make_store) -> None:
+    store = make_store(flush_batch_size=64)
+    try:
+        await store.create("s1")
+        await add_turns(store, "s1", 2)
+        assert len(store._pending) == 4
+        assert store.batches == 0
+
+        history = await store.get_history("s1")
+
+        assert contents(history) == ["question 0", "answer 0", "question 1", "answer 1"]
+        assert store._pending == []
+        assert store.batches == 1
+    finally:
+        await store.aclose()
+
+
+async def test_full_batch_is_written_without_a_read(make_store) -> None:
+    store = make_store(flush_batch_size=2)
+    try:
+        await store.create("s1")
+        await add_turns(store, "s1", 2)
+        assert store._pending == []
+        assert store.batches == 2
+    finally:
+        await store.aclose()
+
+
+async def test_window_keeps_newest_messages_with_summary(make_store) -> None:
+    store = make_store(max_messages=4, summary_questions=2)
+    try:
+        await store.create("s1")
+        await add_turns(store, "s1", 5)
+
+        history = await store.get_history("s1")
+
+        assert contents(history[1:]) == ["question 3", "answer 3", "question 4", "answer 4"]
+        assert history[0]["role"] == "system"
+        # Only the latest `summary_questions` dropped questions are mentioned.
+        assert '"question 1"; "question 2"' in history[0]["content"]
+        assert "question 0" not in history[0]["content"]
+    finally:
+        await store.aclose()
+
+
+async def test_window_without_summary(make_store) -> None:
+    store = make_store(max_messages=4, summarize_dropped=False)
+    try:
+        await store.create("s1")
+        await add_turns(store, "s1", 5)
+
+        history = await store.get_history("s1")
+
+        assert contents(history) == ["question 3", "answer 3", "question 4", "answer 4"]
+    finally:
+        await store.aclose()
+
+
+async def test_sweep_drops_sessions_idle_past_ttl(make_store, clock) -> None:
+    store = make_store(ttl_seconds=60.0, clock=clock)
+    try:
+        await store.create("idle")
+        await add_turns(store, "idle", 1)
+        await store.flush()
+        clock.now += 45
+        await store.create("active")
+        await add_turns(store, "active", 1)
+        await store.flush()
+        clock.now += 30
+
+        assert await store.sweep() == 1
+
+        assert await store.get_history("idle") == []
+        assert contents(await store.get_history("active")) == ["question 0", "answer 0"]
+        assert (await store.stats())["sessions"] == 1
+    finally:
+        await store.aclose()
+
+
+async def test_sweep_keeps_most_recent_max_sessions(make_store, clock) -> None:
+    store = make_store(max_sessions=2, clock=clock)
+    try:
+        for session_id in ("oldest", "older", "newest"):
+            await store.create(session_id)
+            await add_turns(store, session_id, 1)
+            await store.flush()
+            clock.now += 1
+
+        assert await store.sweep() == 1
+
+        assert await store.get_history("oldest") == []
+        assert contents(await store.get_history("newest")) == ["question 0", "answer 0"]
+        assert (await store.stats())["sessions"] == 2
+    finally:
+        await store.aclose()
+
+
+async def test_clear_drops_pending_and_stored_messages(make_store) -> None:
+    store = make_store()
+    try:
+        await store.create("s1")
+        await add_turns(store, "s1", 1)
+        await store.flush()
+        await store.append("s1", "user", "not yet written")
+
+        await store.clear("s1")
+
+        assert store._pending == []
+        assert await store.get_history("s1") == []
+    finally:
+        await store.aclose()
+
+
+async def test_read_your_writes_across_workers(make_store) -> None:
+    writer = make_store()
+    reader = make_store()
+    try:
+        await writer.create("s1")
+        await add_turns(writer, "s1", 1)
+
+        assert contents(await writer.get_history("s1")) == ["question 0", "answer 0"]
+
+        # A worker's read flushes its own buffer first, so it sees its own writes;
+        # other workers see them once they are flushed.
+        await writer.append("s1", "user", "question 1")
+        assert contents(await reader.get_history("s1")) == ["question 0", "answer 0"]
+        assert contents(await writer.get_history("s1")) == ["question 0", "answer 0", "question 1"]
+        assert contents(await reader.get_history("s1")) == ["question 0", "answer 0", "question 1"]
+    finally:
+        await writer.aclose()
+        await reader.aclose()
+
+
+
+async def test_in_memory_sweep_updates_count_before_yielding(clock) -> None:
+    store = SessionStore(ttl_seconds=60.0, max_sessions=3, shards=1, clock=clock)
+    for session_id in ("a", "b", "c"):
+        await store.create(session_id)
+    clock.now += 120
+    sweep = asyncio.ensure_future(store.sweep())
+    # The sweep empties the shard, then yields; a session created meanwhile must not
+    # be evicted against the pre-sweep count.
+    await asyncio.sleep(0)
+    await store.create("d")
+    await store.append("d", "user", "hello")
+
+    assert await sweep == 3
+    assert store.evicted == 0
+    assert len(store) == 1
+    assert contents(await store.get_history("d")) == ["hello"]
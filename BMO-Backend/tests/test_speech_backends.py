@@ -0,0 +1,127 @@
+"""TTS backends offline: the local CPU engine in its process pool, and failover caching."""
+
+from __future__ import annotations
+
+import io
+import sys
+import wave
+from typing import AsyncIterator, List
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import Settings
+from app.services.speech import SpeechService
+from app.services.tts_backends import LocalTTSBackend, audio_mime_type
+from app.services.tts_cache import AudioCache
+
+pytestmark = pytest.mark.anyio
+
+# Stands in for espeak-ng: writes one second of silence as WAV and logs its argv.
+FAKE_ESPEAK = """#!{python}
+import io, sys, wave
+with open({log!r}, "a") as log:
+    log.write(repr(sys.argv[1:]) + "\\n")
+output = io.BytesIO()
+with wave.open(output, "wb") as writer:
+    writer.setnchannels(1)
+    writer.setsampwidth(2)
+    writer.setframerate(22050)
+    writer.writeframes(b"\\0\\0" * 22050)
+sys.stdout.buffer.write(output.getvalue())
+"""
+
+
+def settings(**overrides) -> Settings:
+    return Settings(openrouter_api_key="test", **overrides)
+
+
+class FakeBackend:
+    def __init__(self, name: str, audio: bytes) -> None:
+        self.name = name
+        self.voice = f"fake:{name}"
+        self.audio = audio
+        self.healthy = True
+        self.calls: List[str] = []
+
+    async def synthesize(self, text: str) -> bytes:
+        self.calls.append(text)
+        if not self.healthy:
+            raise RuntimeError(f"{self.name} is down")
+        return self.audio
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        yield await self.synthesize(text)
+
+    async def start(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+
+async def test_local_backend_synthesizes_offline_in_worker_pool(tmp_path, monkeypatch) -> None:
+    log = tmp_path / "espeak.log"
+    binary = tmp_path / "espeak-ng"
+    binary.write_text(FAKE_ESPEAK.format(python=sys.executable, log=str(log)))
+    binary.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path))
+
+    backend = LocalTTSBackend(engine="espeak", voice="en-us", workers=1)
+    try:
+        await backend.start()
+        audio = await backend.synthesize("-5 degrees outside, take a jacket.")
+    finally:
+        await backend.aclose()
+
+    assert audio_mime_type(audio) == "audio/wav"
+    with wave.open(io.BytesIO(audio), "rb") as reader:
+        assert reader.getnframes() == 22050
+    calls = log.read_text().splitlines()
+    # Warm-up utterance first; text starting with "-" is passed after "--".
+    assert calls[0] == repr(["--stdout", "-v", "en-us", "--", "Ready."])
+    assert calls[-1] == repr(["--stdout", "-v", "en-us", "--", "-5 degrees outside, take a jacket."])
+
+
+async def test_failover_to_next_backend() -> None:
+    edge = FakeBackend("edge", b"\xff\xf3edge")
+    local = FakeBackend("local", b"RIFF\0\0\0\0WAVElocal")
+    edge.healthy = False
+    speech = SpeechService(settings(), backends=[edge, local])
+
+    payload = await speech.synthesize("Hello!")
+
+    assert payload["backend"] == "local"
+    assert payload["mime_type"] == "audio/wav"
+    assert edge.calls == ["Hello!"] and local.calls == ["Hello!"]
+
+
+async def test_all_backends_failing_is_a_502() -> None:
+    edge = FakeBackend("edge", b"\xff\xf3edge")
+    edge.healthy = False
+    speech = SpeechService(settings(), backends=[edge])
+
+    with pytest.raises(HTTPException) as excinfo:
+        await speech.synthesize("Hello!")
+    assert excinfo.value.status_code == 502
+
+
+async def test_fallback_clip_is_not_served_after_primary_recovers() -> None:
+    edge = FakeBackend("edge", b"\xff\xf3edge")
+    local = FakeBackend("local", b"RIFF\0\0\0\0WAVElocal")
+    speech = SpeechService(settings(), cache=AudioCache(), backends=[edge, local])
+
+    edge.healthy = False
+    during_outage = await speech.synthesize("Hello!", delivery="url")
+    edge.healthy = True
+    recovered = await speech.synthesize("Hello!", delivery="url")
+
+    assert during_outage["backend"] == "local"
+    assert recovered["backend"] == "edge"
+    assert recovered["audio_id"] != during_outage["audio_id"]
+    # Both clips stay retrievable by the ids that were handed out.
+    assert speech.clip(during_outage["audio_id"]) == local.audio
+    assert speech.clip(recovered["audio_id"]) == edge.audio
+    # From now on the primary's clip comes from the cache.
+    assert (await speech.synthesize("Hello!"))["backend"] == "edge"
+    assert edge.calls == ["Hello!", "Hello!"]